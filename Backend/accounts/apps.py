@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+    
+    def ready(self):
+        from core import lookups  # noqa: F401
+        from . import signals  # noqa: F401
@@ -0,0 +1,325 @@
+"""
+Retention archive for the HIPAA audit trail.
+
+Entries older than ``AUDIT_LOG_RETENTION_DAYS`` are moved out of the live
+AuditLog table into one segment file per calendar month (UTC) under
+``AUDIT_LOG_ARCHIVE_DIR``:
+
+* ``audit-YYYY-MM.jsonl.gz`` holds one JSON object per entry. Segments are
+  append-only: every archive run adds independently compressed gzip members
+  ("blocks"), so the file stays a valid gzip stream and a single block can
+  be read by seeking to its offset.
+* ``audit-YYYY-MM.index.json`` lists each block's offset, length and time
+  range, and which blocks contain entries for each user, so a lookup only
+  decompresses the blocks it needs.
+
+Rows are deleted from the table only after their block is on disk and in
+the index. The index also records the block in progress, so an interrupted
+run is repaired (torn block truncated, or archived rows deleted) the next
+time it runs, and a lock file in the archive directory keeps two runs from
+overlapping. ``search_audit_logs`` reads the live table and the archive
+together.
+"""
+import fcntl
+import gzip
+import heapq
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+
+FIELDS = ('id', 'user_id', 'action', 'resource', 'resource_id', 'ip_address', 'user_agent', 'details', 'timestamp')
+# Live rows fetched per database round trip while searching
+ITERATOR_CHUNK_SIZE = 500
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class ArchiveInProgress(Exception):
+    """Another archive run holds the archive lock"""
+
+
+def archive_dir():
+    return Path(getattr(settings, 'AUDIT_LOG_ARCHIVE_DIR', settings.BASE_DIR / 'audit_archive'))
+
+
+def retention_cutoff():
+    """Entries older than this belong in the archive"""
+    return timezone.now() - timedelta(days=getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 90))
+
+
+def _month(timestamp):
+    return timestamp.astimezone(dt_timezone.utc).strftime('%Y-%m')
+
+
+def _paths(month):
+    directory = archive_dir()
+    return directory / f'audit-{month}.jsonl.gz', directory / f'audit-{month}.index.json'
+
+
+def _load_index(month):
+    _, index_path = _paths(month)
+    if index_path.exists():
+        with open(index_path, encoding='utf-8') as f:
+            return json.load(f)
+    return {'month': month, 'count': 0, 'start': None, 'end': None, 'blocks': [], 'users': {}, 'pending': None}
+
+
+def _save_index(month, index):
+    # Replace atomically so a crash never leaves a half-written index
+    _, index_path = _paths(month)
+    tmp_path = index_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+
+def _recover(month, index):
+    """Finish or undo a block left in progress by an interrupted run"""
+    pending = index.get('pending')
+    if not pending:
+        return
+    segment_path, _ = _paths(month)
+    if index['blocks'] and index['blocks'][-1]['offset'] == pending['offset']:
+        # The block made it into the index; only the delete was lost
+        AuditLog.objects.filter(pk__in=pending['ids']).delete()
+    elif segment_path.exists():
+        with open(segment_path, 'r+b') as f:
+            f.truncate(pending['offset'])
+    index['pending'] = None
+    _save_index(month, index)
+
+
+def _append_block(month, index, rows):
+    segment_path, _ = _paths(month)
+    offset = segment_path.stat().st_size if segment_path.exists() else 0
+    ids = [row['id'] for row in rows]
+    index['pending'] = {'offset': offset, 'ids': ids}
+    _save_index(month, index)
+
+    payload = ''.join(
+        json.dumps(dict(row, timestamp=row['timestamp'].isoformat()), separators=(',', ':')) + '\n'
+        for row in rows
+    )
+    block = gzip.compress(payload.encode('utf-8'))
+    with open(segment_path, 'ab') as f:
+        f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+
+    start = min(row['timestamp'] for row in rows).isoformat()
+    end = max(row['timestamp'] for row in rows).isoformat()
+    index['blocks'].append({'offset': offset, 'length': len(block), 'count': len(rows), 'start': start, 'end': end})
+    for user_id in {row['user_id'] for row in rows}:
+        index['users'].setdefault(str(user_id), []).append(offset)
+    index['count'] += len(rows)
+    index['start'] = min(filter(None, [index['start'], start]))
+    index['end'] = max(filter(None, [index['end'], end]))
+    _save_index(month, index)
+
+    AuditLog.objects.filter(pk__in=ids).delete()
+    index['pending'] = None
+    _save_index(month, index)
+
+
+@contextmanager
+def _run_lock(directory):
+    # flock is released by the kernel when the process dies, so a crashed
+    # run never leaves the archive locked
+    with open(directory / '.lock', 'a') as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ArchiveInProgress(f'Another archive run is in progress in {directory}')
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def archive_before(cutoff, block_size=1000, progress=None):
+    """Move every entry older than ``cutoff`` into the archive; returns the number moved.
+
+    Raises ArchiveInProgress if another run is archiving into the same directory.
+    """
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with _run_lock(directory):
+        return _archive_before(directory, cutoff, block_size, progress)
+
+
+def _archive_before(directory, cutoff, block_size, progress):
+    indexes = {}
+    for index_path in sorted(directory.glob('audit-*.index.json')):
+        month = index_path.name[len('audit-'):-len('.index.json')]
+        indexes[month] = _load_index(month)
+        _recover(month, indexes[month])
+
+    queryset = AuditLog.objects.filter(timestamp__lt=cutoff).order_by('pk').values(*FIELDS)
+    moved = 0
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_id)[:block_size])
+        if not rows:
+            break
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(_month(row['timestamp']), []).append(row)
+        for month, month_rows in sorted(by_month.items()):
+            if month not in indexes:
+                indexes[month] = _load_index(month)
+            _append_block(month, indexes[month], month_rows)
+        moved += len(rows)
+        last_id = rows[-1]['id']
+        if progress:
+            progress(moved)
+    return moved
+
+
+def _months_between(start, end):
+    """Segment months that exist on disk and may overlap [start, end]"""
+    months = []
+    for index_path in sorted(archive_dir().glob('audit-*.index.json')):
+        month = index_path.name[len('audit-'):-len('.index.json')]
+        if start is not None and month < _month(start):
+            continue
+        if end is not None and month > _month(end):
+            continue
+        months.append(month)
+    return months
+
+
+def _read_block(segment_path, block):
+    with open(segment_path, 'rb') as f:
+        f.seek(block['offset'])
+        data = f.read(block['length'])
+    for line in gzip.decompress(data).decode('utf-8').splitlines():
+        row = json.loads(line)
+        row['timestamp'] = parse_datetime(row['timestamp'])
+        yield row
+
+
+def _heap_key(row, newest_first):
+    # Integer microseconds, negated for newest first since heapq pops the
+    # smallest entry
+    micros = (row['timestamp'] - _EPOCH) // timedelta(microseconds=1)
+    return (-micros, -row['id']) if newest_first else (micros, row['id'])
+
+
+def _in_order(blocks, read, newest_first):
+    """Rows of ``blocks`` (read with ``read(block)``) ordered by (timestamp, id).
+
+    Blocks are opened in that order by their time range, and a row is
+    released once no unopened block can hold one that sorts before it, so
+    only blocks whose time ranges overlap are in memory together.
+    """
+    edge = 'end' if newest_first else 'start'
+    heap = []
+    for block in sorted(blocks, key=lambda block: parse_datetime(block[edge]), reverse=newest_first):
+        bound = _heap_key({'timestamp': parse_datetime(block[edge]), 'id': 0}, newest_first)[0]
+        while heap and heap[0][0][0] < bound:
+            yield heapq.heappop(heap)[1]
+        for row in read(block):
+            heapq.heappush(heap, (_heap_key(row, newest_first), row))
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def archived_entries(user=None, action=None, resource=None, start=None, end=None, newest_first=True):
+    """Archived entries matching the filters, as dicts, ordered by (timestamp, id)"""
+    user_id = getattr(user, 'pk', user)
+
+    def matching(segment_path, block):
+        for row in _read_block(segment_path, block):
+            if user_id is not None and row['user_id'] != user_id:
+                continue
+            if action and row['action'] != action:
+                continue
+            if resource and row['resource'] != resource:
+                continue
+            if start is not None and row['timestamp'] < start:
+                continue
+            if end is not None and row['timestamp'] > end:
+                continue
+            yield row
+
+    # Segments hold disjoint calendar months, so they only need ordering
+    # among themselves
+    months = _months_between(start, end)
+    for month in reversed(months) if newest_first else months:
+        index = _load_index(month)
+        if not index['blocks']:
+            continue
+        if start is not None and parse_datetime(index['end']) < start:
+            continue
+        if end is not None and parse_datetime(index['start']) > end:
+            continue
+
+        blocks = index['blocks']
+        if user_id is not None:
+            offsets = set(index['users'].get(str(user_id), []))
+            blocks = [block for block in blocks if block['offset'] in offsets]
+        blocks = [
+            block for block in blocks
+            if not (start is not None and parse_datetime(block['end']) < start)
+            and not (end is not None and parse_datetime(block['start']) > end)
+        ]
+        segment_path, _ = _paths(month)
+        yield from _in_order(blocks, lambda block: matching(segment_path, block), newest_first)
+
+
+def filter_entries(queryset, user=None, action=None, resource=None, start=None, end=None):
+    """Apply the audit search filters to an AuditLog queryset"""
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    if action:
+        queryset = queryset.filter(action=action)
+    if resource:
+        queryset = queryset.filter(resource=resource)
+    if start is not None:
+        queryset = queryset.filter(timestamp__gte=start)
+    if end is not None:
+        queryset = queryset.filter(timestamp__lte=end)
+    return queryset
+
+
+def unique_entries(rows):
+    """Drop repeats of the same entry from rows ordered by (timestamp, id)"""
+    # An interrupted archive run can leave a row in both the table and the
+    # archive; both copies have the same key, so they arrive next to each other
+    last_id = None
+    for row in rows:
+        if row['id'] != last_id:
+            yield row
+        last_id = row['id']
+
+
+def search_audit_logs(user=None, action=None, resource=None, start=None, end=None, include_archived=True,
+                      newest_first=True):
+    """Audit entries from the live table and the archive matching the filters, newest first
+    unless ``newest_first`` is False.
+
+    Entries are dicts with the AuditLog field values (``user_id`` rather
+    than ``user``); ``start`` and ``end`` are inclusive datetimes. The
+    result is an iterator: the table and the archive are read as two
+    streams ordered by (timestamp, id) and merged, and an entry is returned
+    once even if it is in both.
+    """
+    queryset = filter_entries(AuditLog.objects.all(), user, action, resource, start, end)
+    ordering = ('-timestamp', '-id') if newest_first else ('timestamp', 'id')
+    live = queryset.order_by(*ordering).values(*FIELDS).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    if not include_archived:
+        return live
+    return unique_entries(heapq.merge(
+        live, archived_entries(user, action, resource, start, end, newest_first),
+        key=lambda row: (row['timestamp'], row['id']), reverse=newest_first,
+    ))
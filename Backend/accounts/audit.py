@@ -0,0 +1,137 @@
+"""
+Buffered writer for the HIPAA audit trail.
+
+``record()`` puts an unsaved AuditLog on an in-process queue and returns;
+a background thread drains the queue and writes batches with
+``bulk_create``, so request handlers no longer pay for the insert:
+
+* when the queue is full the entry is written synchronously instead;
+* the queue is flushed when the process exits normally;
+* a failed batch is retried row by row, and anything that still cannot be
+  stored is written in full to the ``security`` log.
+
+Entries still queued when the process is killed (SIGKILL, the OOM killer)
+are lost, so background writing is off unless ``AUDIT_LOG_ASYNC = True``;
+otherwise every entry is written synchronously.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import AuditLog
+
+security_logger = logging.getLogger('security')
+
+
+class AuditWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_started(self):
+        # Queues and threads do not survive a fork (e.g. gunicorn workers),
+        # so each process starts its own on first use
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=getattr(settings, 'AUDIT_LOG_BUFFER_SIZE', 10000))
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def record(self, entry):
+        """Store an unsaved AuditLog, in the background when possible"""
+        if not getattr(settings, 'AUDIT_LOG_ASYNC', False):
+            self._write([entry])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Never drop an entry: pay for the insert on this request instead
+            self._write([entry])
+
+    def flush(self):
+        """Write everything queued so far; returns once it is stored"""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        while True:
+            with self._write_lock:
+                batch = self._drain([])
+                self._write(batch)
+                self._done(batch)
+            if not batch:
+                break
+        # Wait for a batch the background thread took before we drained
+        while self._queue.unfinished_tasks and self._thread.is_alive():
+            time.sleep(0.01)
+
+    def _run(self):
+        interval = getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 1.0)
+        while True:
+            try:
+                first = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            with self._write_lock:
+                batch = self._drain([first])
+                self._write(batch)
+                self._done(batch)
+            close_old_connections()
+
+    def _drain(self, batch):
+        limit = getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 200)
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+            if len(batch) >= limit:
+                return batch
+
+    def _done(self, batch):
+        for _ in batch:
+            self._queue.task_done()
+    
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            AuditLog.objects.bulk_create(batch)
+            return
+        except Exception:
+            security_logger.exception('Audit log batch insert failed; retrying %d entries one by one', len(batch))
+        for entry in batch:
+            try:
+                entry.pk = None
+                entry.save(force_insert=True)
+            except Exception:
+                security_logger.error(
+                    'Audit log entry could not be stored: user=%s action=%s resource=%s:%s ip=%s at=%s details=%s',
+                    entry.user_id, entry.action, entry.resource, entry.resource_id,
+                    entry.ip_address, entry.timestamp.isoformat(), entry.details,
+                )
+
+
+writer = AuditWriter()
+atexit.register(writer.flush)
+
+
+def record(entry):
+    writer.record(entry)
+
+
+def flush():
+    writer.flush()
@@ -0,0 +1,42 @@
+"""
+Cached patient counts for the provider directory.
+
+The number of patients assigned to every provider comes from one grouped
+aggregation over PatientProfile and is cached as a single mapping. It is
+dropped when a profile is saved or deleted with a changed
+``assigned_provider`` (see ``signals``).
+
+Only ``PatientProfile.save()`` and ``delete()`` send those signals. A
+queryset ``update(assigned_provider=...)`` or ``bulk_update`` does not, so
+the counts stay stale until the entry expires
+(``PROVIDER_DIRECTORY_CACHE_TIMEOUT``, 600 seconds by default) unless the
+caller also calls ``invalidate_patient_counts()``.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from .models import PatientProfile
+
+PATIENT_COUNTS_KEY = 'accounts:provider-patient-counts'
+
+
+def _cache():
+    return caches[getattr(settings, 'PROVIDER_DIRECTORY_CACHE_ALIAS', 'default')]
+
+
+def patient_counts():
+    """{provider user id: number of assigned patients}, for every provider with at least one"""
+    cache = _cache()
+    counts = cache.get(PATIENT_COUNTS_KEY)
+    if counts is None:
+        rows = PatientProfile.objects.filter(assigned_provider__isnull=False).order_by().values(
+            'assigned_provider'
+        ).annotate(patients=Count('id'))
+        counts = {row['assigned_provider']: row['patients'] for row in rows}
+        cache.set(PATIENT_COUNTS_KEY, counts, getattr(settings, 'PROVIDER_DIRECTORY_CACHE_TIMEOUT', 600))
+    return counts
+
+
+def invalidate_patient_counts():
+    _cache().delete(PATIENT_COUNTS_KEY)
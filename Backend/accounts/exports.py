@@ -0,0 +1,182 @@
+"""
+Streaming CSV / NDJSON / ZIP encoders for large exports, and the record
+source for a patient's full data export.
+
+Rows are read with chunked iteration, encoded one at a time and handed to
+``StreamingHttpResponse`` in chunks of about ``CHUNK_SIZE`` characters, so
+memory use does not grow with the size of the export.
+"""
+import csv
+import json
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import User, PatientProfile
+
+CHUNK_SIZE = 64 * 1024
+# Rows fetched per database round trip
+ITERATOR_CHUNK_SIZE = 500
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+PATIENT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'zip': 'application/zip',
+}
+
+USER_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'role', 'phone', 'date_of_birth', 'address',
+    'emergency_contact', 'emergency_phone', 'profile_picture', 'data_consent', 'consent_date',
+    'created_at', 'updated_at',
+)
+PROFILE_FIELDS = (
+    'id', 'blood_type', 'height', 'weight', 'allergies', 'current_medications',
+    'medical_conditions', 'assigned_provider_id', 'created_at', 'updated_at',
+)
+GOAL_FIELDS = (
+    'id', 'goal_type', 'title', 'target_value', 'current_value', 'unit', 'date',
+    'is_completed', 'is_recurring', 'extra_data', 'created_at', 'updated_at',
+)
+REMINDER_FIELDS = (
+    'id', 'reminder_type', 'title', 'description', 'scheduled_date', 'scheduled_time', 'status',
+    'location', 'notes', 'is_recurring', 'recurrence_interval', 'created_at', 'updated_at',
+)
+
+
+class _ZipBuffer:
+    """Write-only sink for ZipFile whose contents are taken out as they are produced"""
+    def __init__(self):
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def chunked(lines, size=CHUNK_SIZE):
+    """Join small strings into chunks of roughly ``size`` characters"""
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row.get(field)) for field in fields])
+
+
+def encode(fmt, fields, rows):
+    """Chunks of ``rows`` (dicts) encoded as ``fmt``"""
+    if fmt == 'csv':
+        return chunked(csv_lines(fields, rows))
+    return chunked(ndjson_lines(rows))
+
+
+def zip_stream(sections):
+    """ZIP archive bytes with one ``<name>.ndjson`` member per (name, rows) section, streamed.
+
+    The archive is written to a non-seekable sink, so zipfile stores sizes
+    in data descriptors and nothing has to be buffered beyond one chunk.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, rows in sections:
+            with archive.open(f'{name}.ndjson', 'w', force_zip64=True) as member:
+                for chunk in chunked(ndjson_lines(rows)):
+                    member.write(chunk.encode('utf-8'))
+                    data = buffer.drain()
+                    if data:
+                        yield data
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def _goal_logs(user):
+    from wellness.models import WellnessGoal, GoalLogBucket, DailyGoalLog
+    
+    # Walk the goals in pages of ids so the id list is never loaded whole.
+    # Each page's bucket cursor stays open while its entries are yielded;
+    # the legacy query for the page only runs once it is exhausted
+    goal_ids = WellnessGoal.objects.filter(user=user).order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+    while True:
+        page = list(goal_ids.filter(pk__gt=last_id)[:ITERATOR_CHUNK_SIZE])
+        if not page:
+            return
+        buckets = GoalLogBucket.objects.filter(goal_id__in=page).order_by('goal_id', 'bucket_start')
+        for bucket in buckets.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            for entry in bucket.entries():
+                yield {
+                    'goal_id': entry.goal_id, 'value': entry.value,
+                    'notes': entry.notes, 'logged_at': entry.logged_at,
+                }
+        # Entries stored before hourly buckets were introduced
+        legacy = DailyGoalLog.objects.filter(goal_id__in=page).order_by('goal_id', 'logged_at')
+        yield from legacy.values('goal_id', 'value', 'notes', 'logged_at').iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        last_id = page[-1]
+
+
+def patient_sections(user):
+    """(name, rows) pairs covering everything stored about ``user``; rows are read lazily"""
+    from wellness.models import WellnessGoal, PreventiveCareReminder
+    
+    goals = WellnessGoal.objects.filter(user=user).order_by('date', 'pk').values(*GOAL_FIELDS)
+    reminders = PreventiveCareReminder.objects.filter(user=user).order_by('scheduled_date', 'pk').values(*REMINDER_FIELDS)
+    return [
+        ('user', User.objects.filter(pk=user.pk).values(*USER_FIELDS).iterator()),
+        ('patient_profile', PatientProfile.objects.filter(user=user).values(*PROFILE_FIELDS).iterator()),
+        ('goals', goals.iterator(chunk_size=ITERATOR_CHUNK_SIZE)),
+        ('goal_logs', _goal_logs(user)),
+        ('reminders', reminders.iterator(chunk_size=ITERATOR_CHUNK_SIZE)),
+    ]
+
+
+def ndjson_sections(sections):
+    """Chunks of one NDJSON stream tagging every record with its section"""
+    return chunked(ndjson_lines(
+        {'section': name, 'data': row} for name, rows in sections for row in rows
+    ))
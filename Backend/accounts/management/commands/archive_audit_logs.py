@@ -0,0 +1,37 @@
+"""
+Management command to move audit log entries past the retention window into the archive
+Run daily (e.g. from cron): python manage.py archive_audit_logs
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts import archive
+
+
+class Command(BaseCommand):
+    help = 'Move AuditLog entries older than AUDIT_LOG_RETENTION_DAYS into compressed monthly segment files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention window in days, defaults to AUDIT_LOG_RETENTION_DAYS')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries archived per block')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None:
+            if options['days'] < 0:
+                raise CommandError('--days must not be negative')
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        else:
+            cutoff = archive.retention_cutoff()
+        
+        try:
+            moved = archive.archive_before(
+                cutoff,
+                block_size=options['batch_size'],
+                progress=lambda count: self.stdout.write(f'  Archived {count} entries...'),
+            )
+        except archive.ArchiveInProgress as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} audit log entries older than {cutoff:%Y-%m-%d %H:%M} to {archive.archive_dir()}'
+        ))
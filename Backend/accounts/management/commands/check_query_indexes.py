@@ -0,0 +1,77 @@
+"""
+Management command to check that the hot API queries are served by an index
+Run: python manage.py check_query_indexes
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from django.utils import timezone
+from accounts.models import PatientProfile, AuditLog
+from core.query_plans import collection_scans, UnsupportedBackend, UntranslatableQuery
+from health_info.models import HealthArticle
+from wellness.models import WellnessGoal, PreventiveCareReminder, HealthTip
+
+
+def hot_paths(using='default'):
+    """(label, queryset) for the queries behind the busiest endpoints, built as the views build them"""
+    today = timezone.now().date()
+    user_id = 1
+    goals = WellnessGoal.objects.using(using)
+    reminders = PreventiveCareReminder.objects.using(using)
+    articles = HealthArticle.objects.using(using)
+    audit = AuditLog.objects.using(using)
+    return [
+        ('goals list / today goals',
+         goals.filter(user=user_id, date=today).order_by('-date', 'goal_type')),
+        ('weekly progress',
+         goals.filter(user=user_id, date__gte=today - timedelta(days=7), date__lte=today)
+         .order_by().values('date', 'goal_type', 'is_completed')
+         .annotate(goals=Count('id'), total=Sum('current_value'), target=Sum('target_value'))),
+        ('recurring goal templates',
+         goals.filter(user=user_id, is_recurring=True, date__lte=today).order_by('-date')),
+        ('upcoming reminders',
+         reminders.filter(user=user_id, status='upcoming', scheduled_date__gte=today).order_by('scheduled_date')[:5]),
+        ('provider patients',
+         PatientProfile.objects.using(using).filter(assigned_provider=user_id)),
+        ('health articles',
+         articles.filter(is_published=True).listing().order_by('-created_at')),
+        ('featured articles',
+         articles.filter(is_published=True, is_featured=True).listing().order_by('-created_at')[:6]),
+        ('health tip of the day',
+         HealthTip.objects.using(using).filter(is_active=True, display_date=today).order_by('-created_at')[:1]),
+        ('audit trail',
+         audit.filter(user=user_id).order_by('-timestamp')),
+        ('audit search by action',
+         audit.filter(action='view_patient').order_by('-timestamp')),
+        ('audit search by resource',
+         audit.filter(resource='PatientProfile').order_by('-timestamp')),
+        ('audit search by time range',
+         audit.filter(timestamp__gte=timezone.now() - timedelta(days=7)).order_by('-timestamp')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Fail if any hot API query falls back to a full collection scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to explain against')
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset in hot_paths(options['database']):
+            try:
+                scans = collection_scans(queryset)
+            except UnsupportedBackend as e:
+                raise CommandError(str(e))
+            except UntranslatableQuery as e:
+                scans = [str(e)]
+            if scans:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'  {label}: {"; ".join(scans)}'))
+            else:
+                self.stdout.write(f'  {label}: index')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries use a collection scan: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All hot queries are served by an index'))
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -120,10 +121,17 @@ class AuditLog(models.Model):
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True, null=True)
     details = models.JSONField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the buffered writer stores it
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(fields=['action', 'timestamp']),
+            models.Index(fields=['resource', 'timestamp']),
+            models.Index(fields=['timestamp']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.action} - {self.timestamp}"
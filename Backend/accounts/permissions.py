@@ -0,0 +1,9 @@
+from rest_framework import permissions
+
+
+class IsAdmin(permissions.BasePermission):
+    """Authenticated users with the ``admin`` role (compliance officers, operators)"""
+    message = 'Only administrators can access this endpoint'
+    
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role == 'admin')
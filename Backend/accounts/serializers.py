@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.utils import timezone
-from .models import PatientProfile, ProviderProfile
+from .models import PatientProfile, ProviderProfile, AuditLog
 
 User = get_user_model()
 
@@ -84,6 +84,10 @@ class ProviderProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_patient_count(self, obj):
+        # Lists pass every provider's count in the context (see accounts.cache)
+        counts = self.context.get('patient_counts')
+        if counts is not None:
+            return counts.get(obj.user_id, 0)
         return PatientProfile.objects.filter(assigned_provider=obj.user).count()
 
 
@@ -92,33 +96,44 @@ class PatientListSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     compliance_status = serializers.SerializerMethodField()
     goals_met = serializers.SerializerMethodField()
+    next_reminder_date = serializers.SerializerMethodField()
     
     class Meta:
         model = PatientProfile
-        fields = ['id', 'user', 'compliance_status', 'goals_met']
+        fields = ['id', 'user', 'compliance_status', 'goals_met', 'next_reminder_date']
+    
+    def get_snapshot(self, obj):
+        from wellness.models import PatientComplianceSnapshot
+        try:
+            snapshot = obj.user.compliance_snapshot
+        except PatientComplianceSnapshot.DoesNotExist:
+            snapshot = None
+        if snapshot is None or not snapshot.is_current:
+            snapshot = PatientComplianceSnapshot.objects.refresh_for_users([obj.user_id])[obj.user_id]
+            obj.user.compliance_snapshot = snapshot
+        return snapshot
     
     def get_compliance_status(self, obj):
-        # This would be calculated based on goals and reminders
-        from wellness.models import WellnessGoal
-        today_goals = WellnessGoal.objects.filter(
-            user=obj.user,
-            date=timezone.now().date()
-        )
-        if not today_goals.exists():
-            return 'No Goals Set'
-        
-        completed = today_goals.filter(is_completed=True).count()
-        total = today_goals.count()
-        
-        if completed == total:
-            return 'Goal Met'
-        elif completed > 0:
-            return 'In Progress'
-        return 'Missed'
+        return self.get_snapshot(obj).compliance_status
     
     def get_goals_met(self, obj):
-        from wellness.models import WellnessGoal
-        return WellnessGoal.objects.filter(user=obj.user, is_completed=True).count()
+        return self.get_snapshot(obj).goals_met
+    
+    def get_next_reminder_date(self, obj):
+        return self.get_snapshot(obj).next_reminder_date
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """Audit trail entries for compliance review"""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    
+    class Meta:
+        model = AuditLog
+        fields = [
+            'id', 'user', 'user_email', 'action', 'resource', 'resource_id',
+            'ip_address', 'user_agent', 'details', 'timestamp'
+        ]
+        read_only_fields = fields
 
 
 class ChangePasswordSerializer(serializers.Serializer):
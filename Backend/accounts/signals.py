@@ -0,0 +1,32 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as directory_cache
+from .models import User, PatientProfile
+
+
+@receiver(post_init, sender=PatientProfile)
+def remember_assigned_provider(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred field is not loaded just for this
+    instance._original_provider_id = instance.__dict__.get('assigned_provider_id')
+
+
+@receiver(post_save, sender=PatientProfile)
+def invalidate_on_assignment_change(sender, instance, created, **kwargs):
+    changed = instance.assigned_provider_id != instance._original_provider_id
+    if changed or (created and instance.assigned_provider_id):
+        directory_cache.invalidate_patient_counts()
+    instance._original_provider_id = instance.assigned_provider_id
+
+
+@receiver(post_delete, sender=PatientProfile)
+def invalidate_on_profile_delete(sender, instance, **kwargs):
+    if instance.assigned_provider_id:
+        directory_cache.invalidate_patient_counts()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_on_provider_delete(sender, instance, **kwargs):
+    # Profiles are unassigned with a queryset update, which sends no signals
+    if instance.role == 'provider':
+        directory_cache.invalidate_patient_counts()
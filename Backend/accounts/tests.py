@@ -1,3 +1,622 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import zipfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.query_plans import collection_scans
+from health_info.models import FAQ
+from wellness.models import WellnessGoal, DailyGoalLog, PreventiveCareReminder, PatientComplianceSnapshot
+from . import archive
+from .audit import AuditWriter
+from . import cache as directory_cache
+from .models import User, PatientProfile, ProviderProfile, AuditLog
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ProviderPatientsViewTests(TestCase):
+    def setUp(self):
+        self.provider = User.objects.create_user(
+            email='provider@example.com', password='pass', role='provider',
+            first_name='Pat', last_name='Provider'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.provider)
+        self.url = reverse('provider_patients')
+        self.patient_count = 0
+
+    def add_patients(self, count):
+        today = timezone.now().date()
+        for _ in range(count):
+            self.patient_count += 1
+            user = User.objects.create_user(
+                email=f'patient{self.patient_count}@example.com', password='pass',
+                first_name='Patient', last_name=str(self.patient_count)
+            )
+            PatientProfile.objects.create(user=user, assigned_provider=self.provider)
+            WellnessGoal.objects.create(
+                user=user, goal_type='steps', title='Daily Steps',
+                target_value=100, current_value=100, date=today
+            )
+            WellnessGoal.objects.create(
+                user=user, goal_type='sleep', title='Sleep',
+                target_value=8, current_value=0, date=today
+            )
+            WellnessGoal.objects.create(
+                user=user, goal_type='steps', title='Daily Steps',
+                target_value=100, current_value=150, date=today - timezone.timedelta(days=1)
+            )
+
+    def test_query_count_is_independent_of_panel_size(self):
+        self.add_patients(1)
+        with self.assertNumQueries(2):
+            small = self.client.get(self.url)
+
+        self.add_patients(9)
+        with self.assertNumQueries(2):
+            large = self.client.get(self.url)
+
+        self.assertEqual(len(small.data), 1)
+        self.assertEqual(len(large.data), 10)
+
+    def test_returns_compliance_fields(self):
+        self.add_patients(1)
+        response = self.client.get(self.url)
+
+        patient = response.data[0]
+        self.assertEqual(patient['user']['email'], 'patient1@example.com')
+        self.assertEqual(patient['compliance_status'], 'In Progress')
+        self.assertEqual(patient['goals_met'], 2)
+
+    def test_patient_without_goals(self):
+        user = User.objects.create_user(email='nogoals@example.com', password='pass')
+        PatientProfile.objects.create(user=user, assigned_provider=self.provider)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data[0]['compliance_status'], 'No Goals Set')
+        self.assertEqual(response.data[0]['goals_met'], 0)
+
+    def test_rebuilds_snapshots_from_previous_day(self):
+        self.add_patients(2)
+        PatientComplianceSnapshot.objects.update(
+            date=timezone.now().date() - timezone.timedelta(days=1), compliance_status='Missed'
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([p['compliance_status'] for p in response.data], ['In Progress'] * 2)
+        self.assertFalse(PatientComplianceSnapshot.objects.exclude(date=timezone.now().date()).exists())
+
+    def test_only_providers_can_list_patients(self):
+        patient = User.objects.create_user(email='someone@example.com', password='pass')
+        self.client.force_authenticate(patient)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ProviderPatientDetailViewTests(TestCase):
+    def setUp(self):
+        self.provider = User.objects.create_user(
+            email='provider@example.com', password='pass', role='provider',
+            first_name='Pat', last_name='Provider'
+        )
+        self.patient = User.objects.create_user(email='patient@example.com', password='pass')
+        self.profile = PatientProfile.objects.create(user=self.patient, assigned_provider=self.provider)
+        self.client = APIClient()
+        self.client.force_authenticate(self.provider)
+        self.url = reverse('provider_patient_detail', args=[self.profile.id])
+        self.today = timezone.now().date()
+
+    def add_history(self, days, start=0):
+        for days_ago in range(start, start + days):
+            date = self.today - timezone.timedelta(days=days_ago)
+            WellnessGoal.objects.create(
+                user=self.patient, goal_type='steps', title='Daily Steps', target_value=100,
+                current_value=100 if days_ago % 2 else 0, date=date,
+            )
+            PreventiveCareReminder.objects.create(
+                user=self.patient, reminder_type='checkup', title=f'Visit {days_ago}',
+                scheduled_date=date, status='upcoming' if days_ago % 3 == 0 else 'completed',
+            )
+
+    def test_summary_and_reminder_window(self):
+        self.add_history(60)
+        PreventiveCareReminder.objects.create(
+            user=self.patient, reminder_type='dental', title='Cleaning',
+            scheduled_date=self.today + timezone.timedelta(days=7),
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['profile']['assigned_provider_name'], 'Dr. Pat Provider')
+        # The 10 most recent past reminders, then everything upcoming, however
+        # many past ones there are
+        titles = [r['title'] for r in response.data['reminders']]
+        self.assertEqual(titles, [f'Visit {days_ago}' for days_ago in range(10, -1, -1)] + ['Cleaning'])
+        # 30 days of goals, every other one completed; today is not overdue
+        self.assertEqual(response.data['summary'], {
+            'days': 30, 'goals': 30, 'goals_completed': 15, 'completion_rate': 50, 'overdue_reminders': 19,
+        })
+
+    def test_query_count_does_not_grow_with_history(self):
+        self.add_history(5)
+        # profile with user and provider, goals, upcoming and recent reminders,
+        # rollup totals, overdue count, and the synchronous audit insert
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+        self.add_history(40, start=5)
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+    def test_other_providers_patients_are_hidden(self):
+        other = User.objects.create_user(email='other@example.com', password='pass', role='provider')
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ProviderDirectoryTests(TestCase):
+    def setUp(self):
+        directory_cache.invalidate_patient_counts()
+        self.providers = []
+        for index, (specialization, hospital) in enumerate([
+            ('Cardiology', 'General Hospital'),
+            ('Pediatrics', 'General Hospital'),
+            ('Cardiology', 'City Clinic'),
+        ]):
+            user = User.objects.create_user(email=f'dr{index}@example.com', password='pass', role='provider')
+            ProviderProfile.objects.create(user=user, specialization=specialization, hospital_affiliation=hospital)
+            self.providers.append(user)
+        for index in range(3):
+            patient = User.objects.create_user(email=f'patient{index}@example.com', password='pass')
+            PatientProfile.objects.create(user=patient, assigned_provider=self.providers[0])
+        self.patient = patient
+        self.client = APIClient()
+        self.client.force_authenticate(patient)
+        self.url = reverse('provider_directory')
+
+    def counts(self, **params):
+        response = self.client.get(self.url, params)
+        return {row['user']['email']: row['patient_count'] for row in response.data['results']}
+
+    def test_search_by_specialization_and_hospital(self):
+        self.assertEqual(self.counts(specialization='cardio'), {'dr0@example.com': 3, 'dr2@example.com': 0})
+        self.assertEqual(self.counts(specialization='cardio', hospital='general'), {'dr0@example.com': 3})
+
+    def test_counts_come_from_one_cached_query(self):
+        for index in range(10):
+            user = User.objects.create_user(email=f'extra{index}@example.com', password='pass', role='provider')
+            ProviderProfile.objects.create(user=user)
+        directory_cache.invalidate_patient_counts()
+
+        # the grouped count, then the providers joined with their users
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 13)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_reassignment_invalidates_counts(self):
+        self.counts()
+        profile = self.patient.patient_profile
+        profile.assigned_provider = self.providers[1]
+        profile.save()
+
+        counts = self.counts()
+        self.assertEqual(counts['dr0@example.com'], 2)
+        self.assertEqual(counts['dr1@example.com'], 1)
+
+        # Saving without changing the provider keeps the cached counts
+        profile = PatientProfile.objects.get(pk=profile.pk)
+        profile.allergies = 'None'
+        with mock.patch.object(directory_cache, 'invalidate_patient_counts') as invalidate:
+            profile.save()
+        invalidate.assert_not_called()
+
+class QueryIndexCoverageTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+
+        call_command('check_query_indexes', stdout=out)
+
+        self.assertIn('All hot queries are served by an index', out.getvalue())
+
+    def test_detects_collection_scan(self):
+        self.assertTrue(collection_scans(FAQ.objects.filter(category='general').order_by('order')))
+
+
+class AuditWriterTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.writer = AuditWriter()
+
+    def entry(self, **kwargs):
+        return AuditLog(user=self.user, action='view_profile', resource='User', **kwargs)
+
+    @override_settings(AUDIT_LOG_ASYNC=True)
+    def test_background_writes_are_flushed(self):
+        for _ in range(5):
+            self.writer.record(self.entry())
+
+        self.writer.flush()
+
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+    @override_settings(AUDIT_LOG_ASYNC=True)
+    def test_request_path_does_not_insert(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with mock.patch('accounts.audit.writer', self.writer):
+            with CaptureQueriesContext(connection) as queries:
+                client.get(reverse('profile'))
+            self.writer.flush()
+
+        self.assertFalse([q for q in queries.captured_queries if 'accounts_auditlog' in q['sql']])
+
+        self.assertEqual(AuditLog.objects.get().action, 'view_profile')
+
+    @override_settings(AUDIT_LOG_ASYNC=True)
+    def test_full_buffer_writes_synchronously(self):
+        # A queue nobody drains, holding one entry
+        self.writer._pid = os.getpid()
+        self.writer._queue = queue.Queue(maxsize=1)
+        self.writer._thread = threading.Thread(target=lambda: None)
+        with mock.patch.object(self.writer, '_ensure_started'):
+            self.writer.record(self.entry())
+            self.writer.record(self.entry())
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.writer.flush()
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    def test_failed_batch_is_retried_row_by_row(self):
+        orphan = AuditLog(user_id=self.user.id + 1000, action='login')
+
+        with self.assertLogs('security', 'ERROR') as logs:
+            self.writer._write([self.entry(), orphan])
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertTrue(any('could not be stored' in line and 'action=login' in line for line in logs.output))
+
+
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        settings_override = override_settings(AUDIT_LOG_ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.alice = User.objects.create_user(email='alice@example.com', password='pass')
+        self.bob = User.objects.create_user(email='bob@example.com', password='pass')
+        self.now = timezone.now()
+
+    def log(self, user, days_ago, action='view_profile', resource='User'):
+        return AuditLog.objects.create(
+            user=user, action=action, resource=resource,
+            timestamp=self.now - timezone.timedelta(days=days_ago),
+        )
+
+    def test_old_entries_move_to_monthly_segments(self):
+        old = [self.log(self.alice, 200), self.log(self.bob, 200), self.log(self.alice, 120)]
+        recent = self.log(self.alice, 1)
+
+        moved = archive.archive_before(self.now - timezone.timedelta(days=90), block_size=2)
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(list(AuditLog.objects.values_list('pk', flat=True)), [recent.pk])
+        segments = sorted(name for name in os.listdir(self.archive_dir) if name != '.lock')
+        months = {archive._month(entry.timestamp) for entry in old}
+        self.assertEqual(segments, sorted(
+            [f'audit-{m}.jsonl.gz' for m in months] + [f'audit-{m}.index.json' for m in months]
+        ))
+        # Every segment is still a plain gzip JSONL file
+        for month in months:
+            with gzip.open(os.path.join(self.archive_dir, f'audit-{month}.jsonl.gz'), 'rt') as f:
+                self.assertTrue(all(line.startswith('{') for line in f))
+
+    def test_search_combines_table_and_archive(self):
+        old = self.log(self.alice, 200)
+        self.log(self.bob, 200)
+        self.log(self.alice, 150, action='update_profile')
+        archive.archive_before(self.now - timezone.timedelta(days=90))
+        recent = self.log(self.alice, 1)
+
+        results = list(archive.search_audit_logs(user=self.alice, action='view_profile'))
+
+        self.assertEqual([row['id'] for row in results], [recent.pk, old.pk])
+        self.assertEqual(results[1]['timestamp'], old.timestamp)
+        self.assertEqual(results[1]['user_id'], self.alice.pk)
+
+        window = list(archive.search_audit_logs(
+            start=self.now - timezone.timedelta(days=201), end=self.now - timezone.timedelta(days=199)
+        ))
+        self.assertEqual(len(window), 2)
+        self.assertEqual(list(archive.search_audit_logs(user=self.bob, include_archived=False)), [])
+
+    def test_archived_entries_are_merged_newest_first(self):
+        # Archived in id order, so every block mixes old and newer entries
+        entries = [self.log(self.alice, days_ago) for days_ago in (95, 200, 120, 100, 210, 96)]
+        archive.archive_before(self.now - timezone.timedelta(days=90), block_size=2)
+        recent = self.log(self.alice, 1)
+
+        results = [row['id'] for row in archive.search_audit_logs(user=self.alice)]
+
+        expected = sorted(entries, key=lambda entry: entry.timestamp, reverse=True)
+        self.assertEqual(results, [recent.pk] + [entry.pk for entry in expected])
+
+    def test_overlapping_runs_are_refused(self):
+        self.log(self.alice, 200)
+        cutoff = self.now - timezone.timedelta(days=90)
+
+        with archive._run_lock(archive.archive_dir()):
+            with self.assertRaises(archive.ArchiveInProgress):
+                archive.archive_before(cutoff)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+        self.assertEqual(archive.archive_before(cutoff), 1)
+
+    def test_user_lookup_reads_only_that_users_blocks(self):
+        self.log(self.alice, 200)
+        self.log(self.bob, 200)
+        archive.archive_before(self.now - timezone.timedelta(days=90), block_size=1)
+
+        with mock.patch.object(archive, '_read_block', wraps=archive._read_block) as read_block:
+            results = list(archive.search_audit_logs(user=self.bob))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(read_block.call_count, 1)
+
+    def test_interrupted_delete_is_finished_on_next_run(self):
+        entry = self.log(self.alice, 200)
+        with mock.patch('django.db.models.query.QuerySet.delete', side_effect=RuntimeError('connection lost')):
+            with self.assertRaises(RuntimeError):
+                archive.archive_before(self.now - timezone.timedelta(days=90))
+        self.assertTrue(AuditLog.objects.filter(pk=entry.pk).exists())
+        # Not returned twice while it is in both places
+        self.assertEqual(len(list(archive.search_audit_logs(user=self.alice))), 1)
+
+        self.assertEqual(archive.archive_before(self.now - timezone.timedelta(days=90)), 0)
+
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual(len(list(archive.search_audit_logs(user=self.alice))), 1)
+
+    def test_torn_block_is_truncated_on_next_run(self):
+        self.log(self.alice, 200)
+        archive.archive_before(self.now - timezone.timedelta(days=90))
+        entry = self.log(self.alice, 200)
+        segment = os.path.join(self.archive_dir, f'audit-{archive._month(entry.timestamp)}.jsonl.gz')
+
+        def torn_write(data):
+            with open(segment, 'ab') as f:
+                f.write(b'\x1f\x8b partial')
+            raise OSError('disk full')
+
+        with mock.patch.object(archive.gzip, 'compress', side_effect=torn_write):
+            with self.assertRaises(OSError):
+                archive.archive_before(self.now - timezone.timedelta(days=90))
+        self.assertTrue(AuditLog.objects.filter(pk=entry.pk).exists())
+
+        self.assertEqual(archive.archive_before(self.now - timezone.timedelta(days=90)), 1)
+
+        with gzip.open(segment, 'rt') as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(len(list(archive.search_audit_logs(user=self.alice))), 2)
+
+    def test_command_uses_retention_window(self):
+        self.log(self.alice, 40)
+        self.log(self.alice, 10)
+        out = StringIO()
+
+        with override_settings(AUDIT_LOG_RETENTION_DAYS=30):
+            call_command('archive_audit_logs', stdout=out)
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertIn('Archived 1 audit log entries', out.getvalue())
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class AuditLogApiTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='officer@example.com', password='pass', role='admin')
+        self.patient = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.now = timezone.now()
+        for days_ago in range(5):
+            AuditLog.objects.create(
+                user=self.patient, action='view_profile', resource='User',
+                timestamp=self.now - timezone.timedelta(days=days_ago),
+            )
+        AuditLog.objects.create(user=self.admin, action='view_patient', resource='PatientProfile', timestamp=self.now)
+
+    def stream(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_only_admins_can_read_the_audit_log(self):
+        self.client.force_authenticate(self.patient)
+
+        self.assertEqual(self.client.get(reverse('audit_log')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('audit_log_export')).status_code, 403)
+
+    def test_filters_and_keyset_pages(self):
+        url = reverse('audit_log')
+        response = self.client.get(url, {'user': self.patient.id, 'action': 'view_profile', 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        seen = [row['timestamp'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [row['timestamp'] for row in response.data['results']]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+        response = self.client.get(url, {'resource': 'PatientProfile'})
+        self.assertEqual([row['user_email'] for row in response.data['results']], ['officer@example.com'])
+
+        since = (self.now - timezone.timedelta(days=1, hours=1)).date().isoformat()
+        response = self.client.get(url, {'user': self.patient.id, 'from': since})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('audit_log'), {'from': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('audit_log'), {'user': 'me'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('audit_log_export'), {'output': 'xml'}).status_code, 400)
+
+    def test_export_streams_ndjson(self):
+        response = self.client.get(reverse('audit_log_export'), {'user': self.patient.id})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in self.stream(response).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row['timestamp'] for row in rows], sorted(row['timestamp'] for row in rows))
+        # The export itself is audited
+        self.assertTrue(AuditLog.objects.filter(user=self.admin, action='export_data', resource='AuditLog').exists())
+
+    def test_export_csv_includes_archived_entries(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        with override_settings(AUDIT_LOG_ARCHIVE_DIR=archive_dir):
+            archive.archive_before(self.now - timezone.timedelta(days=2))
+            params = {'user': self.patient.id, 'output': 'csv'}
+
+            live_only = self.stream(self.client.get(reverse('audit_log_export'), params))
+            params['include_archived'] = 'true'
+            response = self.client.get(reverse('audit_log_export'), params)
+            rows = list(csv.DictReader(self.stream(response).splitlines()))
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(len(live_only.splitlines()), 1 + 3)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({row['action'] for row in rows}, {'view_profile'})
+        self.assertEqual([row['timestamp'] for row in rows], sorted(row['timestamp'] for row in rows))
+
+    def test_export_includes_entry_left_in_both_places_once(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        with override_settings(AUDIT_LOG_ARCHIVE_DIR=archive_dir):
+            # The archive run is interrupted after writing its block
+            with mock.patch('django.db.models.query.QuerySet.delete', side_effect=RuntimeError('connection lost')):
+                with self.assertRaises(RuntimeError):
+                    archive.archive_before(self.now - timezone.timedelta(days=2))
+            response = self.client.get(reverse('audit_log_export'), {'user': self.patient.id, 'include_archived': 'true'})
+            rows = [json.loads(line) for line in self.stream(response).splitlines()]
+
+        self.assertEqual(AuditLog.objects.filter(user=self.patient).count(), 5)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len({row['id'] for row in rows}), 5)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class PatientDataExportTests(TestCase):
+    def setUp(self):
+        self.patient = User.objects.create_user(email='patient@example.com', password='pass')
+        PatientProfile.objects.create(user=self.patient, blood_type='O+', allergies='Peanuts')
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        today = timezone.now().date()
+        for days_ago in range(3):
+            goal = WellnessGoal.objects.create(
+                user=self.patient, goal_type='steps', title='Daily Steps',
+                target_value=6000, unit='steps', date=today - timezone.timedelta(days=days_ago),
+            )
+            WellnessGoal.objects.log_progress(goal.id, self.patient, 1000, notes='walk')
+            WellnessGoal.objects.log_progress(goal.id, self.patient, 500)
+        DailyGoalLog.objects.create(goal=goal, value=250)
+        PreventiveCareReminder.objects.create(
+            user=self.patient, reminder_type='checkup', title='Annual physical', scheduled_date=today,
+        )
+        WellnessGoal.objects.create(user=other, goal_type='steps', title='Daily Steps', date=today)
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+        self.url = reverse('data_export')
+
+    def test_ndjson_export_contains_every_record(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        counts = {}
+        for record in records:
+            counts[record['section']] = counts.get(record['section'], 0) + 1
+        self.assertEqual(counts, {'user': 1, 'patient_profile': 1, 'goals': 3, 'goal_logs': 7, 'reminders': 1})
+        user = next(r['data'] for r in records if r['section'] == 'user')
+        self.assertEqual(user['email'], 'patient@example.com')
+        self.assertNotIn('password', user)
+        notes = [r['data']['notes'] for r in records if r['section'] == 'goal_logs']
+        self.assertEqual(notes.count('walk'), 3)
+
+    def test_zip_export_has_one_file_per_section(self):
+        response = self.client.get(self.url, {'output': 'zip'})
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                ['user.ndjson', 'patient_profile.ndjson', 'goals.ndjson', 'goal_logs.ndjson', 'reminders.ndjson'],
+            )
+            goals = archive.read('goals.ndjson').decode('utf-8').splitlines()
+            profile = json.loads(archive.read('patient_profile.ndjson'))
+        self.assertEqual(len(goals), 3)
+        self.assertEqual(profile['allergies'], 'Peanuts')
+
+    def test_export_is_audited_before_and_after_streaming(self):
+        response = self.client.get(self.url)
+        next(iter(response.streaming_content))
+
+        entries = AuditLog.objects.filter(user=self.patient, action='export_data').order_by('pk')
+        self.assertEqual([e.details for e in entries], [{'output': 'ndjson', 'stage': 'started'}])
+
+        b''.join(response.streaming_content)
+        self.assertEqual([e.details for e in entries.all()], [
+            {'output': 'ndjson', 'stage': 'started'},
+            {'output': 'ndjson', 'stage': 'finished', 'completed': True},
+        ])
+
+    def test_failed_export_is_audited_as_incomplete(self):
+        def failing_logs(user):
+            raise RuntimeError('connection lost')
+            yield
+
+        with mock.patch('accounts.exports._goal_logs', failing_logs):
+            response = self.client.get(self.url)
+            self.assertFalse(AuditLog.objects.filter(action='export_data').exists())
+            with self.assertRaises(RuntimeError):
+                b''.join(response.streaming_content)
+
+        entries = AuditLog.objects.filter(user=self.patient, action='export_data').order_by('pk')
+        self.assertEqual([e.details for e in entries], [
+            {'output': 'ndjson', 'stage': 'started'},
+            {'output': 'ndjson', 'stage': 'finished', 'completed': False},
+        ])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get(self.url, {'output': 'pdf'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AuditLog.objects.filter(action='export_data').exists())
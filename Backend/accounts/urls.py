@@ -2,7 +2,8 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     RegisterView, CustomTokenObtainPairView, LogoutView, CurrentUserView,
-    ProfileView, ChangePasswordView, ProviderPatientsView, ProviderPatientDetailView
+    ProfileView, ChangePasswordView, ProviderPatientsView, ProviderPatientDetailView,
+    AuditLogListView, AuditLogExportView, PatientDataExportView, ProviderDirectoryView
 )
 
 urlpatterns = [
@@ -16,9 +17,15 @@ urlpatterns = [
     path('me/', CurrentUserView.as_view(), name='current_user'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('change-password/', ChangePasswordView.as_view(), name='change_password'),
+    path('export/', PatientDataExportView.as_view(), name='data_export'),
     
     # Provider endpoints
+    path('providers/', ProviderDirectoryView.as_view(), name='provider_directory'),
     path('provider/patients/', ProviderPatientsView.as_view(), name='provider_patients'),
     path('provider/patients/<int:patient_id>/', ProviderPatientDetailView.as_view(), name='provider_patient_detail'),
+    
+    # Compliance (administrators)
+    path('audit/', AuditLogListView.as_view(), name='audit_log'),
+    path('audit/export/', AuditLogExportView.as_view(), name='audit_log_export'),
 ]
 
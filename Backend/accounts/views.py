@@ -1,4 +1,9 @@
 import logging
+from datetime import datetime, time, timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -6,10 +11,14 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 
+from . import archive, audit, exports
+from . import cache as directory_cache
 from .models import PatientProfile, ProviderProfile, AuditLog
+from .permissions import IsAdmin
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, PatientProfileSerializer,
-    ProviderProfileSerializer, PatientListSerializer, ChangePasswordSerializer
+    ProviderProfileSerializer, PatientListSerializer, ChangePasswordSerializer,
+    AuditLogSerializer
 )
 
 User = get_user_model()
@@ -24,7 +33,9 @@ def log_action(user, action, resource=None, resource_id=None, request=None, deta
         ip_address = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR'))
         user_agent = request.META.get('HTTP_USER_AGENT')
     
-    AuditLog.objects.create(
+    # Written before returning unless AUDIT_LOG_ASYNC opts in to batched
+    # writes from a background thread; see accounts.audit
+    audit.record(AuditLog(
         user=user,
         action=action,
         resource=resource,
@@ -32,10 +43,29 @@ def log_action(user, action, resource=None, resource_id=None, request=None, deta
         ip_address=ip_address,
         user_agent=user_agent,
         details=details
-    )
+    ))
     security_logger.info(f"User {user.email} performed {action} on {resource}:{resource_id}")
 
 
+def audited_stream(chunks, user, action, resource=None, resource_id=None, request=None, details=None):
+    """Yield ``chunks`` with the action logged twice: before the first chunk is
+    sent, so the access is on record even if the process dies mid-stream, and
+    once the stream ends, with whether it was sent completely.
+    """
+    details = details or {}
+    log_action(user, action, resource, resource_id, request, details=dict(details, stage='started'))
+    completed = False
+    try:
+        yield from chunks
+        completed = True
+    finally:
+        # Also runs when the stream fails or the client disconnects
+        log_action(
+            user, action, resource, resource_id, request,
+            details=dict(details, stage='finished', completed=completed)
+        )
+
+
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [permissions.AllowAny]
@@ -176,7 +206,24 @@ class ProviderPatientsView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        patients = PatientProfile.objects.filter(assigned_provider=request.user)
+        # Compliance is read from each patient's snapshot joined into the same
+        # query; snapshots that are missing or from a previous day are rebuilt
+        # in one batch
+        from wellness.models import PatientComplianceSnapshot
+        patients = list(
+            PatientProfile.objects.filter(
+                assigned_provider=request.user
+            ).select_related('user', 'user__compliance_snapshot')
+        )
+        stale = [
+            p.user for p in patients
+            if not hasattr(p.user, 'compliance_snapshot') or not p.user.compliance_snapshot.is_current
+        ]
+        if stale:
+            snapshots = PatientComplianceSnapshot.objects.refresh_for_users([u.id for u in stale])
+            for user in stale:
+                user.compliance_snapshot = snapshots[user.id]
+        
         serializer = PatientListSerializer(patients, many=True)
         
         log_action(request.user, 'view_patient', 'PatientList', None, request)
@@ -184,9 +231,20 @@ class ProviderPatientsView(APIView):
 
 
 class ProviderPatientDetailView(APIView):
-    """View for providers to see detailed patient information"""
+    """View for providers to see detailed patient information.
+
+    Reminders are limited to the next upcoming ones and the most recent
+    past ones within a window, read with one bounded query each; the
+    summary block is read from the daily goal rollups, so the response costs
+    the same handful of queries however much history the patient has.
+    """
     permission_classes = [permissions.IsAuthenticated]
     
+    RECENT_REMINDER_DAYS = 30
+    MAX_UPCOMING_REMINDERS = 10
+    MAX_RECENT_REMINDERS = 10
+    SUMMARY_DAYS = 30
+    
     def get(self, request, patient_id):
         if request.user.role != 'provider':
             return Response(
@@ -195,7 +253,7 @@ class ProviderPatientDetailView(APIView):
             )
         
         try:
-            patient_profile = PatientProfile.objects.get(
+            patient_profile = PatientProfile.objects.select_related('user', 'assigned_provider').get(
                 id=patient_id,
                 assigned_provider=request.user
             )
@@ -208,14 +266,187 @@ class ProviderPatientDetailView(APIView):
         log_action(request.user, 'view_patient', 'PatientProfile', patient_id, request)
         
         # Get patient's wellness data
-        from wellness.models import WellnessGoal, PreventiveCareReminder
+        from django.db.models import Sum
+        from wellness.models import WellnessGoal, PreventiveCareReminder, GoalDailyRollup
         from wellness.serializers import WellnessGoalSerializer, PreventiveCareReminderSerializer
         
-        goals = WellnessGoal.objects.filter(user=patient_profile.user).order_by('-date')[:10]
-        reminders = PreventiveCareReminder.objects.filter(user=patient_profile.user)
+        patient = patient_profile.user
+        today = timezone.now().date()
+        goals = WellnessGoal.objects.filter(user=patient).order_by('-date')[:10]
+        upcoming = PreventiveCareReminder.objects.filter(
+            user=patient,
+            scheduled_date__gte=today
+        ).order_by('scheduled_date', 'scheduled_time')[:self.MAX_UPCOMING_REMINDERS]
+        recent = PreventiveCareReminder.objects.filter(
+            user=patient,
+            scheduled_date__gte=today - timedelta(days=self.RECENT_REMINDER_DAYS),
+            scheduled_date__lt=today
+        ).order_by('-scheduled_date', '-scheduled_time')[:self.MAX_RECENT_REMINDERS]
+        # Oldest first, as before
+        reminders = list(reversed(recent)) + list(upcoming)
+        
+        totals = GoalDailyRollup.objects.filter(
+            user=patient,
+            date__gt=today - timedelta(days=self.SUMMARY_DAYS),
+            date__lte=today
+        ).aggregate(goals=Sum('goals'), completed=Sum('completed'))
+        goals_total = totals['goals'] or 0
+        completed = totals['completed'] or 0
+        overdue = PreventiveCareReminder.objects.filter(
+            user=patient, status='upcoming', scheduled_date__lt=today
+        ).count()
         
         return Response({
             'profile': PatientProfileSerializer(patient_profile).data,
             'goals': WellnessGoalSerializer(goals, many=True).data,
             'reminders': PreventiveCareReminderSerializer(reminders, many=True).data,
+            'summary': {
+                'days': self.SUMMARY_DAYS,
+                'goals': goals_total,
+                'goals_completed': completed,
+                'completion_rate': round(completed * 100 / goals_total) if goals_total else 0,
+                'overdue_reminders': overdue,
+            },
         })
+
+
+class ProviderDirectoryView(generics.ListAPIView):
+    """Active providers, searchable by specialization and hospital, with their patient counts"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ProviderProfileSerializer
+    ordering = ['id']
+    
+    def get_queryset(self):
+        queryset = ProviderProfile.objects.filter(
+            user__role='provider', user__is_active=True
+        ).select_related('user')
+        
+        specialization = self.request.query_params.get('specialization')
+        if specialization:
+            queryset = queryset.filter(specialization__icontains=specialization)
+        
+        hospital = self.request.query_params.get('hospital')
+        if hospital:
+            queryset = queryset.filter(hospital_affiliation__icontains=hospital)
+        
+        return queryset
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # One cached grouped count instead of a count query per provider
+        context['patient_counts'] = directory_cache.patient_counts()
+        return context
+
+
+def _parse_bound(value, end=False):
+    """Aware datetime for a ``from``/``to`` parameter; a bare date covers the whole day"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def audit_search_params(params):
+    """search_audit_logs() keyword arguments from query parameters; ValueError with a message if invalid"""
+    criteria = {
+        'user': None,
+        'action': params.get('action') or None,
+        'resource': params.get('resource') or None,
+        'start': None,
+        'end': None,
+    }
+    if params.get('user'):
+        try:
+            criteria['user'] = int(params['user'])
+        except ValueError:
+            raise ValueError('user must be a user id')
+    try:
+        if params.get('from'):
+            criteria['start'] = _parse_bound(params['from'])
+        if params.get('to'):
+            criteria['end'] = _parse_bound(params['to'], end=True)
+    except ValueError:
+        raise ValueError('from and to must be ISO 8601 dates or datetimes')
+    return criteria
+
+
+class AuditLogListView(generics.ListAPIView):
+    """Audit trail for compliance officers, filtered by user, action, resource and time range"""
+    permission_classes = [IsAdmin]
+    serializer_class = AuditLogSerializer
+    ordering = ['-timestamp']
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            self.criteria = audit_search_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        return archive.filter_entries(AuditLog.objects.select_related('user'), **self.criteria)
+
+
+class AuditLogExportView(APIView):
+    """Stream the filtered audit trail as NDJSON (default) or CSV, oldest first.
+
+    Rows are read with a server-side cursor and encoded as they are sent, so
+    exports of any size run in constant memory. ``include_archived=true``
+    merges in entries from the retention archive; an entry left in both
+    places by an interrupted archive run is exported once.
+    """
+    permission_classes = [IsAdmin]
+    
+    def get(self, request):
+        fmt = request.query_params.get('output', 'ndjson')
+        if fmt not in exports.CONTENT_TYPES:
+            return Response(
+                {'error': f"Unsupported output, expected one of: {', '.join(exports.CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            criteria = audit_search_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        include_archived = request.query_params.get('include_archived', '').lower() in ('true', '1', 'yes')
+        rows = archive.search_audit_logs(**criteria, include_archived=include_archived, newest_first=False)
+        
+        content = audited_stream(
+            exports.encode(fmt, archive.FIELDS, rows), request.user, 'export_data', 'AuditLog', None, request,
+            details={k: str(v) for k, v in criteria.items() if v is not None},
+        )
+        response = StreamingHttpResponse(content, content_type=exports.CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="audit-log-{timezone.now():%Y%m%d}.{fmt}"'
+        return response
+
+
+class PatientDataExportView(APIView):
+    """Stream everything stored about the current user as NDJSON (default) or a ZIP of NDJSON files"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        fmt = request.query_params.get('output', 'ndjson')
+        if fmt not in exports.PATIENT_CONTENT_TYPES:
+            return Response(
+                {'error': f"Unsupported output, expected one of: {', '.join(exports.PATIENT_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        sections = exports.patient_sections(request.user)
+        if fmt == 'zip':
+            content = exports.zip_stream(sections)
+        else:
+            content = exports.ndjson_sections(sections)
+        
+        content = audited_stream(
+            content, request.user, 'export_data', 'PatientData', request.user.id, request, details={'output': fmt}
+        )
+        response = StreamingHttpResponse(content, content_type=exports.PATIENT_CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="health-data-{timezone.now():%Y%m%d}.{fmt}"'
+        return response
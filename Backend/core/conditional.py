@@ -0,0 +1,50 @@
+"""
+Conditional GET (ETag / If-None-Match) support for API views.
+
+ETags are built from cheap metadata - row counts and the latest
+``updated_at`` of the querysets behind a response - so a matching request
+gets a 304 after one aggregate query per queryset, without running the
+view's serializers.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def queryset_state(queryset, field='updated_at'):
+    """(row count, latest ``field`` value) of ``queryset``, in one aggregate query"""
+    state = queryset.order_by().aggregate(count=Count('pk'), latest=Max(field))
+    return state['count'], state['latest']
+
+
+def make_etag(*parts):
+    """Strong ETag for a response determined by ``parts``"""
+    digest = hashlib.md5(json.dumps(parts, cls=DjangoJSONEncoder).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+def conditional_get(method):
+    """Decorate a view's ``get`` to answer matching If-None-Match requests with 304.
+
+    The view provides ``get_etag(request, *args, **kwargs)``; returning None
+    skips the check for that request.
+    """
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        etag = view.get_etag(request, *args, **kwargs)
+        if etag is None:
+            return method(view, request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = method(view, request, *args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                return response
+        response['ETag'] = etag
+        return response
+    return wrapper
@@ -0,0 +1,17 @@
+"""
+Lookups registered project-wide.
+
+``filter(flag=True)`` normally compiles to a bare ``WHERE "flag"``. djongo
+cannot translate a bare column into a MongoDB filter, and SQLite cannot use
+an index for one, so boolean equality is always compiled as a comparison
+with a parameter.
+"""
+from django.db.models import BooleanField
+from django.db.models.lookups import BuiltinLookup, Exact
+
+
+@BooleanField.register_lookup
+class BooleanExact(Exact):
+    def as_sql(self, compiler, connection):
+        # Skip Exact's shortcut for boolean right-hand sides
+        return BuiltinLookup.as_sql(self, compiler, connection)
@@ -0,0 +1,146 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are selected with a WHERE clause on the last row's ordering values
+instead of an offset, so every page costs the same as the first one.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """Opaque-cursor pagination keyed on the queryset's ordering.
+
+    The ordering comes from the view's ``ordering`` attribute, the queryset or
+    the model's ``Meta.ordering``, with the primary key appended as a tie
+    breaker. NULLs are assumed to sort before all other values, as they do
+    in MongoDB.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            queryset = queryset.order_by(*[self.invert(field) for field in self.ordering])
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forwards there is always a previous page once a cursor is
+        # used; going backwards there is always a next page
+        self.next_position = None
+        self.previous_position = None
+        if rows:
+            if has_more if not reverse else True:
+                self.next_position = self.position_of(rows[-1])
+            if position is not None and (has_more if reverse else True):
+                self.previous_position = self.position_of(rows[0])
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.next_position, reverse=False),
+            'previous': self.get_link(self.previous_position, reverse=True),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 50
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+            if requested > 0:
+                page_size = requested
+        except (KeyError, ValueError):
+            pass
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'ordering', None) or queryset.query.order_by or queryset.model._meta.ordering
+        ordering = list(ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not any(field.lstrip('-') in ('pk', pk_name) for field in ordering):
+            ordering.append('-pk' if ordering and ordering[0].startswith('-') else 'pk')
+        return ordering
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def position_of(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def after(self, position, reverse):
+        """Q matching rows strictly after ``position`` in the (possibly reversed) ordering"""
+        condition = Q(pk__in=[])
+        for index, field in enumerate(self.ordering):
+            if reverse:
+                field = self.invert(field)
+            clause = self.field_after(field, position[index])
+            for previous_field, previous_value in zip(self.ordering[:index], position[:index]):
+                clause &= self.field_equals(previous_field.lstrip('-'), previous_value)
+            condition |= clause
+        return condition
+
+    @staticmethod
+    def field_after(field, value):
+        name = field.lstrip('-')
+        if field.startswith('-'):
+            # Descending: NULLs come last, so nothing sorts after a NULL
+            if value is None:
+                return Q(pk__in=[])
+            return Q(**{f'{name}__lt': value}) | Q(**{f'{name}__isnull': True})
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f'{name}__gt': value})
+
+    @staticmethod
+    def field_equals(name, value):
+        if value is None:
+            return Q(**{f'{name}__isnull': True})
+        return Q(**{name: value})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(cursor, cls=DjangoJSONEncoder).encode('utf-8')).decode('ascii')
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
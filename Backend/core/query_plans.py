@@ -0,0 +1,100 @@
+"""
+Query plan inspection used to check that hot queries are served by an index.
+
+A QuerySet is compiled exactly as it would be for the request and the
+resulting statement is explained: on MongoDB through djongo, the find or
+aggregate command djongo translates the SQL into is run through ``explain``;
+on SQLite, which stands in for MongoDB in tests, the SQL goes through
+``EXPLAIN QUERY PLAN``.
+"""
+from django.db import connections
+
+
+class UnsupportedBackend(Exception):
+    pass
+
+
+class UntranslatableQuery(Exception):
+    """djongo cannot turn the QuerySet's SQL into a MongoDB command"""
+
+
+def collection_scans(queryset):
+    """Return the plan steps of ``queryset`` that read a whole table/collection.
+
+    An empty list means the query is answered from an index.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'sqlite':
+        return _sqlite_scans(connection, table, sql, params)
+    if connection.vendor == 'djongo':
+        return _mongo_scans(connection, sql, params)
+    raise UnsupportedBackend(f'Query plans are not supported for the {connection.vendor} backend')
+
+
+def _sqlite_scans(connection, table, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        steps = [row[-1] for row in cursor.fetchall()]
+    # "SEARCH t USING INDEX ..." and "SCAN t USING INDEX ..." both read an
+    # index; a bare "SCAN t" reads every row
+    return [
+        step for step in steps
+        if step.startswith('SCAN') and table in step and 'INDEX' not in step
+    ]
+
+
+def _mongo_command(connection, sql, params):
+    """The find or aggregate command djongo runs for ``sql``"""
+    from djongo.exceptions import SQLDecodeError
+    from djongo.sql2mongo.query import Query
+
+    connection.ensure_connection()
+    try:
+        # Parsing only builds the converters; nothing is sent to MongoDB
+        query = Query(connection.client_connection, connection.connection,
+                      connection.djongo_connection, sql, params)._query
+    except SQLDecodeError as e:
+        raise UntranslatableQuery(f'djongo cannot translate the query: {e.__cause__ or e}') from e
+
+    if query._needs_aggregation():
+        return {'aggregate': query.left_table, 'pipeline': query._make_pipeline(), 'cursor': {}}
+    command = {'find': query.left_table}
+    for converter in (query.where, query.selected_columns, query.limit, query.order, query.offset):
+        if converter:
+            command.update(converter.to_mongo())
+    # pymongo's find() takes lists for these; the command wants documents
+    if isinstance(command.get('projection'), list):
+        command['projection'] = {column: True for column in command['projection']}
+    if 'sort' in command:
+        command['sort'] = dict(command['sort'])
+    return command
+
+
+def _mongo_scans(connection, sql, params):
+    command = _mongo_command(connection, sql, params)
+    plan = connection.connection.command('explain', command, verbosity='queryPlanner')
+    return [stage for winning in _winning_plans(plan) for stage in _stages(winning) if stage == 'COLLSCAN']
+
+
+def _winning_plans(explain):
+    # A find explains to one queryPlanner; an aggregate may nest it under the
+    # $cursor stage of its pipeline
+    if isinstance(explain, dict):
+        if 'winningPlan' in explain:
+            yield explain['winningPlan']
+        for value in explain.values():
+            yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for value in explain:
+            yield from _winning_plans(value)
+
+
+def _stages(plan):
+    yield plan.get('stage')
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from _stages(child)
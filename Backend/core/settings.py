@@ -160,8 +160,57 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 50)),
 }
 
+# Upper bound for the ?page_size= query parameter on paginated list endpoints
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 200))
+
+# Cache - per-process memory by default; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared backend (e.g. Memcached) when running several workers
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'healthcare-portal'),
+    }
+}
+
+# Seconds a cached dashboard response is kept; changes to the user's goals,
+# logs and reminders invalidate it earlier
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 300))
+
+# Provider directory patient counts; reassigning a patient invalidates them
+PROVIDER_DIRECTORY_CACHE_TIMEOUT = int(os.getenv('PROVIDER_DIRECTORY_CACHE_TIMEOUT', 600))
+
+# Public health content: server-side cache lifetime (entries are also retired
+# on every article/FAQ/policy change) and the Cache-Control lifetimes sent to
+# browsers (max-age) and CDNs/proxies (s-maxage)
+HEALTH_INFO_CACHE_TIMEOUT = int(os.getenv('HEALTH_INFO_CACHE_TIMEOUT', 3600))
+HEALTH_INFO_MAX_AGE = int(os.getenv('HEALTH_INFO_MAX_AGE', 60))
+HEALTH_INFO_S_MAXAGE = int(os.getenv('HEALTH_INFO_S_MAXAGE', 300))
+
+# Categories shown (newest article of each) in the homepage "latest" block
+LATEST_ARTICLE_CATEGORIES = [
+    c.strip() for c in os.getenv('LATEST_ARTICLE_CATEGORIES', 'covid,flu,mental_health').split(',') if c.strip()
+]
+
+# SQLite FTS5 file holding the full-text index for /api/health/search/
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', str(BASE_DIR / 'search_index.sqlite3'))
+
+# Audit trail: when enabled, entries are queued and written in batches by a
+# background thread (an entry is written synchronously when the buffer is
+# full). Queued entries are lost if the process is killed, so it is opt-in.
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', 'False').lower() in ('true', '1', 'yes')
+AUDIT_LOG_BUFFER_SIZE = int(os.getenv('AUDIT_LOG_BUFFER_SIZE', 10000))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', 200))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', 1.0))
+
+# Entries older than the retention window are moved to compressed monthly
+# segment files by `python manage.py archive_audit_logs`
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv('AUDIT_LOG_RETENTION_DAYS', 90))
+AUDIT_LOG_ARCHIVE_DIR = os.getenv('AUDIT_LOG_ARCHIVE_DIR', str(BASE_DIR / 'audit_archive'))
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -0,0 +1 @@
+default_app_config = 'health_info.apps.HealthInfoConfig'
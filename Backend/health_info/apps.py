@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HealthInfoConfig(AppConfig):
     name = 'health_info'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
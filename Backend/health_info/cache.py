@@ -0,0 +1,69 @@
+"""
+Cache for the public health information endpoints.
+
+Every entry is keyed on a global content version, which is bumped whenever
+a HealthArticle, FAQ or PrivacyPolicy is saved or deleted (see
+``signals``), so an edit retires all cached responses at once. Responses
+also carry Cache-Control with ``s-maxage`` so a CDN or reverse proxy can
+serve them without reaching the API.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
+
+VERSION_KEY = 'health_info:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'HEALTH_INFO_CACHE_ALIAS', 'default')]
+
+
+def content_version():
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so an evicted version never repeats an old one
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Not set yet: the next read starts a fresh version
+        pass
+
+
+def get_or_build(name, build):
+    """Cached data for ``name`` under the current content version, calling ``build`` on a miss"""
+    cache = _cache()
+    digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+    key = f'health_info:{content_version()}:{digest}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'HEALTH_INFO_CACHE_TIMEOUT', 3600))
+    return data
+
+
+def public_cache(method):
+    """Mark a view's successful and 304 responses as cacheable by browsers and shared caches"""
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        response = method(view, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=getattr(settings, 'HEALTH_INFO_MAX_AGE', 60),
+                s_maxage=getattr(settings, 'HEALTH_INFO_S_MAXAGE', 300),
+            )
+        return response
+    return wrapper
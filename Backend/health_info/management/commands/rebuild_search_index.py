@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the full-text search index for articles and FAQs
+Run: python manage.py rebuild_search_index
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from health_info import search
+from health_info.models import HealthArticle, FAQ
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SQLite full-text search index from published articles and active FAQs'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Rebuilding search index at {settings.SEARCH_INDEX_PATH}...')
+        count = search.rebuild(
+            HealthArticle.objects.filter(is_published=True).iterator(chunk_size=500),
+            FAQ.objects.filter(is_active=True).iterator(chunk_size=500),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents'))
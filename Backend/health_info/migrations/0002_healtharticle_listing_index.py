@@ -0,0 +1,17 @@
+# Generated by Django 3.1.12 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_info', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healtharticle',
+            index=models.Index(fields=['is_published', 'is_featured', 'created_at'], name='health_info_is_publ_263855_idx'),
+        ),
+    ]
@@ -1,4 +1,66 @@
-from django.db import models
+from django.db import connections, models
+
+
+class HealthArticleQuerySet(models.QuerySet):
+    # Columns the list serializers use; the HTML body is the bulk of each
+    # document and is only needed on the detail page
+    LISTING_FIELDS = ['id', 'title', 'slug', 'summary', 'category', 'image_url', 'is_featured', 'created_at']
+    
+    def listing(self):
+        return self.only(*self.LISTING_FIELDS)
+    
+    def latest_per_category(self, categories):
+        """The newest article of each of ``categories`` (in that order), topped up
+        with the newest remaining articles to ``len(categories)``.
+
+        Takes two queries however many categories there are: one picks the
+        ids and one loads those articles.
+        """
+        if connections[self.db].vendor == 'djongo':
+            newest_by_category, newest = self._latest_ids_document(categories)
+        else:
+            newest_by_category, newest = self._latest_ids(categories)
+        ids = [newest_by_category[category] for category in categories if category in newest_by_category]
+        ids += [pk for pk in newest if pk not in ids][:len(categories) - len(ids)]
+        articles = self.in_bulk(ids)
+        return [articles[pk] for pk in ids if pk in articles]
+    
+    def _latest_ids(self, categories):
+        # Published articles newest first, read only until every category
+        # has its newest and there are enough others to top up with
+        wanted = set(categories)
+        newest_by_category, newest = {}, []
+        published = self.filter(is_published=True).order_by('-created_at', '-pk').values_list('pk', 'category')
+        for pk, category in published.iterator():
+            if category in wanted and category not in newest_by_category:
+                newest_by_category[category] = pk
+            elif len(newest) < len(categories):
+                newest.append(pk)
+            if len(newest_by_category) == len(wanted) and len(newest) == len(categories):
+                break
+        return newest_by_category, newest
+    
+    def _latest_ids_document(self, categories):
+        # djongo cannot translate a grouped "first of each category", so the
+        # aggregation runs on the collection directly. The newest 2n articles
+        # always hold n that are not the newest of a category.
+        connection = connections[self.db]
+        connection.ensure_connection()
+        result = next(connection.connection[self.model._meta.db_table].aggregate([
+            {'$match': {'is_published': True}},
+            {'$sort': {'created_at': -1, 'id': -1}},
+            {'$facet': {
+                'latest': [
+                    {'$match': {'category': {'$in': list(categories)}}},
+                    {'$group': {'_id': '$category', 'id': {'$first': '$id'}}},
+                ],
+                'newest': [{'$limit': 2 * len(categories)}, {'$project': {'_id': False, 'id': True}}],
+            }},
+        ]))
+        return (
+            {row['_id']: row['id'] for row in result['latest']},
+            [row['id'] for row in result['newest']],
+        )
 
 
 class HealthArticle(models.Model):
@@ -24,8 +86,13 @@ class HealthArticle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = HealthArticleQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_published', 'is_featured', 'created_at']),
+        ]
     
     def __str__(self):
         return self.title
@@ -0,0 +1,151 @@
+"""
+Full-text search over published health articles and active FAQs.
+
+The index lives in a SQLite FTS5 sidecar file (``SEARCH_INDEX_PATH``) next to
+the main MongoDB database, which has no efficient text search through djongo
+(``icontains`` becomes a regex collection scan). Documents are updated one at
+a time from the model signals and can be rebuilt from scratch with
+``python manage.py rebuild_search_index``.
+"""
+import html
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.html import strip_tags
+
+ARTICLE = 'article'
+FAQ_KIND = 'faq'
+MAX_RESULTS = 50
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    kind UNINDEXED, object_id UNINDEXED, slug UNINDEXED, category UNINDEXED,
+    title, body,
+    tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@contextmanager
+def _index():
+    connection = sqlite3.connect(str(settings.SEARCH_INDEX_PATH), timeout=10)
+    try:
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def _rowid(kind, object_id):
+    # Articles and FAQs share one table; keep their rowids apart
+    return object_id * 2 + (1 if kind == FAQ_KIND else 0)
+
+
+def _plain_text(value):
+    return html.unescape(strip_tags(value or ''))
+
+
+def _article_row(article):
+    body = f'{_plain_text(article.summary)}\n{_plain_text(article.content)}'
+    return (_rowid(ARTICLE, article.pk), ARTICLE, article.pk, article.slug, article.category,
+            _plain_text(article.title), body)
+
+
+def _faq_row(faq):
+    return (_rowid(FAQ_KIND, faq.pk), FAQ_KIND, faq.pk, '', faq.category,
+            _plain_text(faq.question), _plain_text(faq.answer))
+
+
+def _write(connection, kind, obj, row, searchable):
+    connection.execute('DELETE FROM documents WHERE rowid = ?', (_rowid(kind, obj.pk),))
+    if searchable:
+        connection.execute(
+            'INSERT INTO documents (rowid, kind, object_id, slug, category, title, body) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)', row
+        )
+
+
+def index_article(article):
+    """Add, update or (when unpublished) remove one article"""
+    with _index() as connection:
+        _write(connection, ARTICLE, article, _article_row(article), article.is_published)
+
+
+def index_faq(faq):
+    """Add, update or (when inactive) remove one FAQ"""
+    with _index() as connection:
+        _write(connection, FAQ_KIND, faq, _faq_row(faq), faq.is_active)
+
+
+def remove(kind, object_id):
+    with _index() as connection:
+        connection.execute('DELETE FROM documents WHERE rowid = ?', (_rowid(kind, object_id),))
+
+
+def rebuild(articles, faqs):
+    """Replace the whole index with the given article and FAQ iterables; returns the document count"""
+    count = 0
+    with _index() as connection:
+        connection.execute('DELETE FROM documents')
+        for kind, objects, make_row in ((ARTICLE, articles, _article_row), (FAQ_KIND, faqs, _faq_row)):
+            for obj in objects:
+                connection.execute(
+                    'INSERT INTO documents (rowid, kind, object_id, slug, category, title, body) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', make_row(obj)
+                )
+                count += 1
+        connection.execute("INSERT INTO documents (documents) VALUES ('optimize')")
+    return count
+
+
+def match_expression(query):
+    """FTS5 query matching every word of ``query`` as a prefix, or None if there are no words"""
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search(query, category=None, kind=None, limit=20):
+    """Ranked matches for ``query`` as dicts, best first; titles weigh ten times the body"""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+
+    sql = (
+        "SELECT kind, object_id, slug, category, title, "
+        "snippet(documents, 5, '', '', '...', 16), bm25(documents, 0, 0, 0, 0, 10.0, 1.0) AS score "
+        "FROM documents WHERE documents MATCH ?"
+    )
+    params = [expression]
+    if category:
+        sql += ' AND category = ?'
+        params.append(category)
+    if kind:
+        sql += ' AND kind = ?'
+        params.append(kind)
+    sql += ' ORDER BY score LIMIT ?'
+    params.append(min(limit, MAX_RESULTS))
+
+    with _index() as connection:
+        rows = connection.execute(sql, params).fetchall()
+    return [
+        {
+            'type': row[0],
+            'id': row[1],
+            'slug': row[2] or None,
+            'category': row[3],
+            'title': row[4],
+            'snippet': row[5],
+            # bm25() is lower for better matches
+            'score': round(-row[6], 4),
+        }
+        for row in rows
+    ]
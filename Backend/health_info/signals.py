@@ -0,0 +1,53 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as content_cache
+from . import search
+from .models import HealthArticle, PrivacyPolicy, FAQ
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=HealthArticle)
+@receiver(post_save, sender=PrivacyPolicy)
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=HealthArticle)
+@receiver(post_delete, sender=PrivacyPolicy)
+@receiver(post_delete, sender=FAQ)
+def bump_content_version(sender, instance, **kwargs):
+    content_cache.bump_version()
+
+
+def _update_index(update, *args):
+    # A failed index write must not fail the save; rebuild_search_index repairs it
+    def run():
+        try:
+            update(*args)
+        except Exception:
+            logger.exception('Search index update failed')
+        # Drop search results cached between the save and the index write
+        content_cache.bump_version()
+    transaction.on_commit(run)
+
+
+@receiver(post_save, sender=HealthArticle)
+def index_article(sender, instance, **kwargs):
+    _update_index(search.index_article, instance)
+
+
+@receiver(post_save, sender=FAQ)
+def index_faq(sender, instance, **kwargs):
+    _update_index(search.index_faq, instance)
+
+
+@receiver(post_delete, sender=HealthArticle)
+def unindex_article(sender, instance, **kwargs):
+    _update_index(search.remove, search.ARTICLE, instance.pk)
+
+
+@receiver(post_delete, sender=FAQ)
+def unindex_faq(sender, instance, **kwargs):
+    _update_index(search.remove, search.FAQ_KIND, instance.pk)
@@ -1,3 +1,277 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import search
+from .models import HealthArticle, HealthArticleQuerySet, PrivacyPolicy, FAQ
+from .serializers import HealthArticleListSerializer
+
+
+class ArticleConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.article = HealthArticle.objects.create(
+            title='Flu Season', slug='flu-season', summary='Summary', content='<p>Content</p>',
+            category='flu', is_featured=True
+        )
+
+    def test_list_and_detail_return_304_for_matching_etag(self):
+        # Versioned content endpoints revalidate without touching the database
+        for url, queries in (
+            (reverse('articles_list'), 1), (reverse('featured_articles'), 0), (reverse('latest_articles'), 0),
+            (reverse('article_detail', args=['flu-season']), 0),
+        ):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_editing_an_article_changes_the_etag(self):
+        url = reverse('article_detail', args=['flu-season'])
+        etag = self.client.get(url)['ETag']
+
+        self.article.summary = 'Updated'
+        self.article.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], 'Updated')
+
+    def test_unpublishing_changes_the_list_etag(self):
+        url = reverse('articles_list')
+        etag = self.client.get(url)['ETag']
+
+        HealthArticle.objects.filter(pk=self.article.pk).update(is_published=False)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_article_is_still_404(self):
+        response = self.client.get(reverse('article_detail', args=['missing']))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class PublicContentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.faq = FAQ.objects.create(question='How?', answer='Like this.')
+        HealthArticle.objects.create(
+            title='Flu Season', slug='flu-season', summary='Summary', content='Content', category='flu'
+        )
+        self.urls = [
+            reverse('public_health_info'), reverse('featured_articles'), reverse('latest_articles'),
+            reverse('faq_list'), reverse('privacy_policy'), reverse('article_detail', args=['flu-season']),
+        ]
+
+    def test_repeated_requests_are_served_from_cache(self):
+        for url in self.urls:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.data, first.data, url)
+            self.assertIn('s-maxage=300', second['Cache-Control'])
+            self.assertIn('public', second['Cache-Control'])
+
+    def test_saves_and_deletes_retire_cached_content(self):
+        for url in self.urls:
+            self.client.get(url)
+
+        self.faq.answer = 'Differently.'
+        self.faq.save()
+        self.assertEqual(self.client.get(reverse('faq_list')).data['results'][0]['answer'], 'Differently.')
+        self.assertEqual(self.client.get(reverse('public_health_info')).data['faqs'][0]['answer'], 'Differently.')
+
+        PrivacyPolicy.objects.create(title='Policy', content='...', version='2.0', effective_date='2026-01-01')
+        self.assertEqual(self.client.get(reverse('privacy_policy')).data['version'], '2.0')
+
+        HealthArticle.objects.get(slug='flu-season').delete()
+        self.assertEqual(self.client.get(reverse('article_detail', args=['flu-season'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('latest_articles')).data, [])
+
+    def test_faq_pages_are_cached_separately(self):
+        FAQ.objects.create(question='Why?', answer='Because.', order=1)
+
+        first = self.client.get(reverse('faq_list') + '?page_size=1')
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual([f['question'] for f in first.data['results'] + second.data['results']], ['How?', 'Why?'])
+
+
+class ArticleListingProjectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for i, category in enumerate(['covid', 'flu', 'mental_health', 'nutrition']):
+            HealthArticle.objects.create(
+                title=f'Article {i}', slug=f'article-{i}', summary='Summary',
+                content='<p>' + 'x' * 10000 + '</p>', category=category, is_featured=True
+            )
+
+    def test_list_endpoints_never_load_article_bodies(self):
+        for url in (
+            reverse('articles_list'), reverse('featured_articles'), reverse('latest_articles'),
+            reverse('public_health_info'),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+            self.assertTrue(selects)
+            for sql in selects:
+                self.assertNotIn('"content"', sql, url)
+
+    def test_listing_fields_cover_the_list_serializer(self):
+        self.assertLessEqual(
+            set(HealthArticleListSerializer.Meta.fields), set(HealthArticleQuerySet.LISTING_FIELDS)
+        )
+
+    def test_detail_still_has_content(self):
+        response = self.client.get(reverse('article_detail', args=['article-0']))
+
+        self.assertIn('xxxx', response.data['content'])
+
+
+class LatestArticlesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('latest_articles')
+        self.count = 0
+
+    def add(self, category, **kwargs):
+        self.count += 1
+        return HealthArticle.objects.create(
+            title=f'Article {self.count}', slug=f'article-{self.count}', summary='...', content='...',
+            category=category, **kwargs
+        )
+
+    def test_newest_of_each_category_in_configured_order(self):
+        old_flu = self.add('flu')
+        mental = self.add('mental_health')
+        self.add('nutrition')
+        flu = self.add('flu')
+        covid = self.add('covid')
+        self.add('covid', is_published=False)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([a['id'] for a in response.data], [covid.id, flu.id, mental.id])
+        self.assertNotIn(old_flu.id, [a['id'] for a in response.data])
+
+    def test_query_count_does_not_grow_with_categories(self):
+        categories = [category for category, _ in HealthArticle.CATEGORY_CHOICES]
+        for category in categories:
+            self.add(category)
+            self.add(category)
+
+        queries = []
+        for configured in (categories[:2], categories):
+            with CaptureQueriesContext(connection) as context:
+                latest = HealthArticle.objects.listing().latest_per_category(configured)
+            self.assertEqual([a.category for a in latest], configured)
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+        self.assertLessEqual(queries[1], 2)
+
+    def test_backfills_with_newest_other_articles(self):
+        flu = self.add('flu')
+        self.add('general')
+        fitness = self.add('fitness')
+        older_flu = HealthArticle.objects.filter(pk=self.add('flu').pk)
+        older_flu.update(created_at=flu.created_at - timedelta(days=1))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([a['id'] for a in response.data][:2], [flu.id, fitness.id])
+        self.assertEqual(len(response.data), 3)
+
+    @override_settings(LATEST_ARTICLE_CATEGORIES=['nutrition', 'flu'])
+    def test_categories_are_configurable(self):
+        flu = self.add('flu')
+        nutrition = self.add('nutrition')
+        self.add('covid')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([a['id'] for a in response.data], [nutrition.id, flu.id])
+
+    def test_cached_until_an_article_changes(self):
+        self.add('flu')
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        covid = self.add('covid')
+
+        self.assertEqual(self.client.get(self.url).data[0]['id'], covid.id)
+
+
+@override_settings(SEARCH_INDEX_PATH=os.path.join(tempfile.mkdtemp(), 'search.sqlite3'))
+class HealthSearchTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        search.rebuild([], [])
+        self.client = APIClient()
+        self.flu = HealthArticle.objects.create(
+            title='Flu Vaccination Guide', slug='flu-vaccination', summary='Why to get vaccinated',
+            content='<p>The <strong>influenza</strong> vaccine is updated every season.</p>', category='flu'
+        )
+        self.sleep = HealthArticle.objects.create(
+            title='Better Sleep', slug='better-sleep', summary='Rest well',
+            content='<p>Vaccination does not help you sleep.</p>', category='general'
+        )
+        self.faq = FAQ.objects.create(question='Is the flu vaccine safe?', answer='Yes.', category='flu')
+
+    def search(self, **params):
+        return self.client.get(reverse('health_search'), params)
+
+    def test_ranks_title_matches_first_and_strips_html(self):
+        response = self.search(q='vaccination', type='article')
+
+        self.assertEqual([r['slug'] for r in response.data['results']], ['flu-vaccination', 'better-sleep'])
+        self.assertNotIn('<', response.data['results'][1]['snippet'])
+
+    def test_prefix_matching_and_filters(self):
+        results = self.search(q='vacc').data['results']
+        self.assertEqual({(r['type'], r['id']) for r in results},
+                         {('article', self.flu.id), ('article', self.sleep.id), ('faq', self.faq.id)})
+
+        results = self.search(q='vacc', category='flu', type='faq').data['results']
+        self.assertEqual([(r['type'], r['id']) for r in results], [('faq', self.faq.id)])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.flu.is_published = False
+        self.flu.save()
+        self.assertEqual(self.search(q='influenza').data['count'], 0)
+
+        self.sleep.content = 'Naps and influenza recovery'
+        self.sleep.save()
+        self.assertEqual(self.search(q='influenza').data['results'][0]['slug'], 'better-sleep')
+
+        self.faq.delete()
+        self.assertEqual(self.search(q='safe').data['count'], 0)
+
+    def test_rebuild_command(self):
+        HealthArticle.objects.filter(pk=self.sleep.pk).update(title='Sleep Hygiene')
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        cache.clear()
+
+        self.assertEqual(self.search(q='hygiene').data['results'][0]['id'], self.sleep.id)
+        self.assertEqual(self.search(q='vaccine').data['count'], 3)
+
+    def test_requires_query(self):
+        self.assertEqual(self.search(q='  ').status_code, 400)
+        self.assertEqual(self.search(q='flu', type='policy').status_code, 400)
@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
     HealthArticleListView, HealthArticleDetailView, FeaturedArticlesView,
-    LatestArticlesView, PrivacyPolicyView, FAQListView, PublicHealthInfoView
+    LatestArticlesView, PrivacyPolicyView, FAQListView, PublicHealthInfoView, HealthSearchView
 )
 
 urlpatterns = [
@@ -15,6 +15,9 @@ urlpatterns = [
     path('privacy-policy/', PrivacyPolicyView.as_view(), name='privacy_policy'),
     path('faqs/', FAQListView.as_view(), name='faq_list'),
     
+    # Full-text search
+    path('search/', HealthSearchView.as_view(), name='health_search'),
+    
     # Combined
     path('public/', PublicHealthInfoView.as_view(), name='public_health_info'),
 ]
@@ -1,7 +1,12 @@
-from rest_framework import generics, permissions
+from django.conf import settings
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.conditional import conditional_get, make_etag, queryset_state
+from . import cache as content_cache
+from . import search
+from .cache import public_cache
 from .models import HealthArticle, PrivacyPolicy, FAQ
 from .serializers import (
     HealthArticleListSerializer, HealthArticleDetailSerializer,
@@ -14,8 +19,15 @@ class HealthArticleListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = HealthArticleListSerializer
     
+    def get_etag(self, request):
+        return make_etag(request.get_full_path(), queryset_state(self.get_queryset()))
+    
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
-        queryset = HealthArticle.objects.filter(is_published=True)
+        queryset = HealthArticle.objects.filter(is_published=True).listing()
         
         # Filter by category
         category = self.request.query_params.get('category')
@@ -36,6 +48,17 @@ class HealthArticleDetailView(generics.RetrieveAPIView):
     serializer_class = HealthArticleDetailSerializer
     lookup_field = 'slug'
     
+    def get_etag(self, request, slug):
+        return make_etag('article', slug, content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        slug = kwargs['slug']
+        return Response(content_cache.get_or_build(
+            f'article:{slug}', lambda: self.retrieve(request, *args, **kwargs).data
+        ))
+    
     def get_queryset(self):
         return HealthArticle.objects.filter(is_published=True)
 
@@ -44,55 +67,62 @@ class FeaturedArticlesView(APIView):
     """Get featured health articles for homepage"""
     permission_classes = [permissions.AllowAny]
     
+    def get_etag(self, request):
+        return make_etag('featured', content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
     def get(self, request):
-        articles = HealthArticle.objects.filter(is_published=True, is_featured=True)[:6]
-        serializer = HealthArticleListSerializer(articles, many=True)
-        return Response(serializer.data)
+        return Response(content_cache.get_or_build('featured', self.build))
+    
+    def build(self):
+        articles = HealthArticle.objects.filter(is_published=True, is_featured=True).listing()[:6]
+        return HealthArticleListSerializer(articles, many=True).data
 
 
 class LatestArticlesView(APIView):
     """Get latest health articles"""
     permission_classes = [permissions.AllowAny]
     
+    def get_etag(self, request):
+        return make_etag('latest', settings.LATEST_ARTICLE_CATEGORIES, content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
     def get(self, request):
-        # Get one article from each main category
-        categories = ['covid', 'flu', 'mental_health']
-        articles = []
-        
-        for cat in categories:
-            article = HealthArticle.objects.filter(
-                is_published=True, 
-                category=cat
-            ).first()
-            if article:
-                articles.append(article)
-        
-        # If not enough articles, get latest ones
-        if len(articles) < 3:
-            extra = HealthArticle.objects.filter(is_published=True).exclude(
-                id__in=[a.id for a in articles]
-            )[:3 - len(articles)]
-            articles.extend(extra)
-        
-        serializer = HealthArticleListSerializer(articles, many=True)
-        return Response(serializer.data)
+        return Response(content_cache.get_or_build(
+            f'latest:{",".join(settings.LATEST_ARTICLE_CATEGORIES)}', self.build
+        ))
+    
+    def build(self):
+        # Newest article from each configured category, backfilled with the
+        # newest others
+        articles = HealthArticle.objects.listing().latest_per_category(settings.LATEST_ARTICLE_CATEGORIES)
+        return HealthArticleListSerializer(articles, many=True).data
 
 
 class PrivacyPolicyView(APIView):
     """Get current active privacy policy"""
     permission_classes = [permissions.AllowAny]
     
+    def get_etag(self, request):
+        return make_etag('privacy_policy', content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
     def get(self, request):
+        return Response(content_cache.get_or_build('privacy_policy', self.build))
+    
+    def build(self):
         policy = PrivacyPolicy.objects.filter(is_active=True).first()
         if policy:
-            serializer = PrivacyPolicySerializer(policy)
-            return Response(serializer.data)
-        return Response({
+            return PrivacyPolicySerializer(policy).data
+        return {
             'title': 'Privacy Policy',
             'content': 'Privacy policy content is being updated.',
             'version': '1.0',
             'effective_date': '2024-01-01'
-        })
+        }
 
 
 class FAQListView(generics.ListAPIView):
@@ -100,6 +130,18 @@ class FAQListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = FAQSerializer
     
+    def get_etag(self, request):
+        return make_etag('faqs', request.build_absolute_uri(), content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        # Keyed on the full URL: it holds the category, cursor and page size,
+        # and the host the pagination links are built from
+        return Response(content_cache.get_or_build(
+            f'faqs:{request.build_absolute_uri()}', lambda: self.list(request, *args, **kwargs).data
+        ))
+    
     def get_queryset(self):
         queryset = FAQ.objects.filter(is_active=True)
         
@@ -114,14 +156,52 @@ class PublicHealthInfoView(APIView):
     """Combined public health information for homepage"""
     permission_classes = [permissions.AllowAny]
     
+    def get_etag(self, request):
+        return make_etag('public', content_cache.content_version())
+    
+    @public_cache
+    @conditional_get
     def get(self, request):
+        return Response(content_cache.get_or_build('public', self.build))
+    
+    def build(self):
         # Get latest articles
-        latest_articles = HealthArticle.objects.filter(is_published=True)[:6]
+        latest_articles = HealthArticle.objects.filter(is_published=True).listing()[:6]
         
         # Get FAQ
         faqs = FAQ.objects.filter(is_active=True)[:5]
         
-        return Response({
+        return {
             'articles': HealthArticleListSerializer(latest_articles, many=True).data,
             'faqs': FAQSerializer(faqs, many=True).data,
-        })
+        }
+
+
+class HealthSearchView(APIView):
+    """Public endpoint - ranked full-text search over articles and FAQs.
+
+    ``q`` words match as prefixes; optional ``category``, ``type``
+    (``article`` or ``faq``) and ``limit`` narrow the results.
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    @public_cache
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        kind = request.query_params.get('type')
+        if kind not in (None, search.ARTICLE, search.FAQ_KIND):
+            return Response({'error': 'type must be article or faq'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        category = request.query_params.get('category')
+        
+        results = content_cache.get_or_build(
+            f'search:{query}:{category}:{kind}:{limit}',
+            lambda: search.search(query, category=category, kind=kind, limit=max(limit, 1))
+        )
+        return Response({'query': query, 'count': len(results), 'results': results})
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import WellnessGoal, DailyGoalLog, PreventiveCareReminder, HealthTip
+from .models import (
+    WellnessGoal, DailyGoalLog, PreventiveCareReminder, HealthTip, PatientComplianceSnapshot,
+    RecurringGoalTemplate, GoalRolloverRun, GoalDailyRollup, GoalLogBucket
+)
 
 
 @admin.register(WellnessGoal)
@@ -16,6 +19,13 @@ class DailyGoalLogAdmin(admin.ModelAdmin):
     list_filter = ['logged_at']
 
 
+@admin.register(GoalLogBucket)
+class GoalLogBucketAdmin(admin.ModelAdmin):
+    list_display = ['goal', 'bucket_start', 'count', 'total']
+    list_filter = ['bucket_start']
+    readonly_fields = ['goal', 'bucket_start', 'offsets', 'values', 'notes', 'total', 'count']
+
+
 @admin.register(PreventiveCareReminder)
 class PreventiveCareReminderAdmin(admin.ModelAdmin):
     list_display = ['user', 'title', 'reminder_type', 'scheduled_date', 'status']
@@ -29,3 +39,31 @@ class HealthTipAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'is_active', 'display_date']
     list_filter = ['category', 'is_active']
     search_fields = ['title', 'content']
+
+
+@admin.register(RecurringGoalTemplate)
+class RecurringGoalTemplateAdmin(admin.ModelAdmin):
+    list_display = ['user', 'goal_type', 'title', 'target_value', 'unit', 'source_date']
+    list_filter = ['goal_type']
+    search_fields = ['user__email', 'title']
+
+
+@admin.register(PatientComplianceSnapshot)
+class PatientComplianceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'compliance_status', 'today_completed', 'today_total', 'goals_met', 'next_reminder_date']
+    list_filter = ['compliance_status', 'date']
+    search_fields = ['user__email']
+    readonly_fields = ['user', 'date', 'today_total', 'today_completed', 'goals_met', 'compliance_status', 'next_reminder_date', 'updated_at']
+
+
+@admin.register(GoalRolloverRun)
+class GoalRolloverRunAdmin(admin.ModelAdmin):
+    list_display = ['date', 'users_processed', 'goals_created', 'last_user_id', 'started_at', 'completed_at']
+    readonly_fields = ['date', 'last_user_id', 'users_processed', 'goals_created', 'started_at', 'completed_at']
+
+
+@admin.register(GoalDailyRollup)
+class GoalDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'goals', 'completed', 'current_total', 'target_total']
+    search_fields = ['user__email']
+    date_hierarchy = 'date'
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class WellnessConfig(AppConfig):
     name = 'wellness'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,134 @@
+"""
+Per-user cache for the dashboard endpoints (dashboard summary, today's goals,
+upcoming reminders), and the shared health tip of the day.
+
+Entries are keyed on the user, a per-user version, the tip of the day's
+version and today's date. Any change to the user's goals, logs or reminders
+bumps the user's version (see ``signals``) and any change to a
+health tip bumps the tip version, so a stale response is never served and
+the date component retires yesterday's entries at midnight.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import HealthTip
+from .serializers import HealthTipSerializer
+
+logger = logging.getLogger(__name__)
+
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _version_key(user_id):
+    return f'wellness:dashboard:version:{user_id}'
+
+
+_TIP_VERSION_KEY = 'wellness:tip-of-day:version'
+
+
+def _version(cache, key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 0 so a version key evicted from
+        # the cache can never bring back entries written under an older one
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_or_build(name, user, build):
+    """Return the cached response data for ``name`` and ``user``, calling ``build`` on a miss"""
+    cache = _cache()
+    key = (
+        f'wellness:{name}:{user.id}:{_version(cache, _version_key(user.id))}:'
+        f'{_version(cache, _TIP_VERSION_KEY)}:{timezone.now().date().isoformat()}'
+    )
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return data
+
+    _count('misses')
+    data = build()
+    cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    return data
+
+
+def invalidate(user_ids):
+    """Drop every cached dashboard response for the given users"""
+    cache = _cache()
+    user_ids = set(user_ids)
+    for user_id in user_ids:
+        key = _version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Nothing cached for this user yet
+            pass
+    _count('invalidations', len(user_ids))
+    logger.debug('Invalidated dashboard cache for %d users', len(user_ids))
+
+
+DEFAULT_TIP = {
+    'id': 0,
+    'title': 'Stay Hydrated',
+    'content': 'Aim to drink at least 8 glasses of water per day to keep your body hydrated and functioning optimally.',
+    'category': 'hydration',
+}
+
+
+def _tip_key(date):
+    return f'wellness:tip-of-day:{date.isoformat()}'
+
+
+def tip_of_day():
+    """Serialized health tip of the day, shared by every user and computed once per day"""
+    cache = _cache()
+    today = timezone.now().date()
+    data = cache.get(_tip_key(today))
+    if data is None:
+        tip = HealthTip.objects.for_day(today)
+        data = dict(HealthTipSerializer(tip).data) if tip else DEFAULT_TIP
+        cache.set(_tip_key(today), data, 24 * 60 * 60)
+    return data
+
+
+def invalidate_tip():
+    """Drop the cached tip of the day and every cached response that embeds it"""
+    cache = _cache()
+    cache.delete(_tip_key(timezone.now().date()))
+    try:
+        cache.incr(_TIP_VERSION_KEY)
+    except ValueError:
+        # Nothing cached under a tip version yet
+        pass
+
+
+def stats():
+    """Hit/miss/invalidation counters for this process since start (or the last reset)"""
+    with _stats_lock:
+        result = dict(_stats)
+    lookups = result['hits'] + result['misses']
+    result['hit_rate'] = round(result['hits'] / lookups, 4) if lookups else None
+    return result
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
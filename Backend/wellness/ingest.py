@@ -0,0 +1,236 @@
+"""
+Streaming import of wearable data exports (steps, sleep, active time samples)
+
+Samples are read one line at a time from NDJSON or CSV and written in
+fixed-size chunks, so memory use does not grow with the size of the export.
+Each sample needs ``type``, ``value`` and either ``timestamp`` or ``date``;
+bulk imports also need ``user`` (email or id). ``notes`` is optional.
+"""
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import WellnessGoal, DailyGoalLog
+
+FORMATS = ['ndjson', 'csv']
+MAX_REPORTED_ERRORS = 20
+
+
+class InvalidSample(ValueError):
+    pass
+
+
+def detect_format(filename, default='ndjson'):
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+def read_samples(stream, fmt):
+    """Yield raw sample dicts from a binary or text NDJSON/CSV stream"""
+    lines = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in stream)
+    if fmt == 'csv':
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield {'_error': 'Invalid JSON'}
+
+
+def parse_sample(raw):
+    """Return (user key, goal type, date, logged_at, value, notes) for a raw sample"""
+    if not isinstance(raw, dict):
+        raise InvalidSample('Sample must be an object')
+    if '_error' in raw:
+        raise InvalidSample(raw['_error'])
+
+    goal_type = raw.get('type')
+    if goal_type not in WellnessGoal.DEFAULT_GOALS:
+        raise InvalidSample(f'Unsupported sample type: {goal_type}')
+    try:
+        value = float(raw.get('value'))
+    except (TypeError, ValueError):
+        raise InvalidSample('Invalid value')
+
+    # The parsers raise TypeError for non-string input and ValueError for
+    # well-formed but impossible values such as month 13
+    try:
+        logged_at = parse_datetime(raw['timestamp']) if raw.get('timestamp') else None
+        date = parse_date(raw['date']) if logged_at is None and raw.get('date') else None
+    except (TypeError, ValueError):
+        raise InvalidSample('Missing or invalid timestamp/date')
+    if logged_at is not None:
+        if timezone.is_naive(logged_at):
+            logged_at = timezone.make_aware(logged_at)
+        date = timezone.localtime(logged_at).date()
+    else:
+        if date is None:
+            raise InvalidSample('Missing or invalid timestamp/date')
+        logged_at = timezone.make_aware(datetime.combine(date, time.min))
+
+    return raw.get('user'), goal_type, date, logged_at, value, raw.get('notes') or ''
+
+
+class WearableImport:
+    """Import parsed samples into goals and logs, ``chunk_size`` samples at a time.
+
+    When ``user`` is given every sample is attributed to that user and any
+    ``user`` column is ignored.
+    """
+
+    def __init__(self, user=None, chunk_size=1000):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.samples = 0
+        self.imported = 0
+        self.skipped = 0
+        self.goals_created = 0
+        self.errors = []
+        self._user_ids = {}
+
+    def run(self, raw_samples):
+        raw_samples = iter(raw_samples)
+        while True:
+            chunk = list(islice(raw_samples, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk)
+        return self
+
+    def summary(self):
+        return {
+            'samples': self.samples,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'goals_created': self.goals_created,
+            'errors': self.errors,
+        }
+
+    def _skip(self, number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'sample': number, 'error': message})
+
+    def _import_chunk(self, chunk):
+        parsed = []
+        for raw in chunk:
+            self.samples += 1
+            try:
+                parsed.append((self.samples,) + parse_sample(raw))
+            except InvalidSample as e:
+                self._skip(self.samples, str(e))
+
+        user_ids = self._resolve_users({p[1] for p in parsed})
+        samples = []
+        for number, user_key, goal_type, date, logged_at, value, notes in parsed:
+            user_id = user_ids.get(user_key)
+            if user_id is None:
+                self._skip(number, f'Unknown user: {user_key}')
+                continue
+            samples.append(((user_id, goal_type, date), logged_at, value, notes))
+        if not samples:
+            return
+
+        created = []
+        goal_ids = self._goal_ids({key for key, _, _, _ in samples}, created)
+        logs = [
+            DailyGoalLog(goal_id=goal_ids[key], value=value, notes=notes, logged_at=logged_at)
+            for key, logged_at, value, notes in samples
+        ]
+        completed = WellnessGoal.objects.apply_logs(logs)
+        self.imported += len(logs)
+
+        from .signals import goals_updated
+        goal_keys = {goal_id: key for key, goal_id in goal_ids.items()}
+        goals_updated(
+            [(key[0], key[2]) for key in goal_keys.values()],
+            completed=[(goal_keys[goal_id][0], goal_keys[goal_id][2]) for goal_id, done in completed.items() if done],
+            created=created,
+        )
+
+    def _resolve_users(self, keys):
+        """Map user keys (emails or ids) to user ids, caching across chunks"""
+        if self.user is not None:
+            return {key: self.user.id for key in keys}
+
+        unknown = {key for key in keys if key not in self._user_ids}
+        if unknown:
+            emails = {str(key) for key in unknown if key is not None and '@' in str(key)}
+            ids = {int(key) for key in unknown if key is not None and str(key).isdigit()}
+            User = get_user_model()
+            for user_id, email in User.objects.filter(email__in=emails).values_list('id', 'email'):
+                self._user_ids[email] = user_id
+            for user_id in User.objects.filter(id__in=ids).values_list('id', flat=True):
+                self._user_ids[user_id] = user_id
+                self._user_ids[str(user_id)] = user_id
+            for key in unknown:
+                self._user_ids.setdefault(key, None)
+        return self._user_ids
+
+    def _goal_ids(self, keys, created):
+        """Map (user_id, goal_type, date) keys to goal ids, creating missing goals from the defaults.
+
+        (user_id, date) of goals inserted without model signals are appended
+        to ``created``.
+        """
+        goal_ids = self._existing_goal_ids(keys)
+        missing = keys - set(goal_ids)
+        if missing:
+            new_goals = []
+            for user_id, goal_type, date in missing:
+                defaults = WellnessGoal.DEFAULT_GOALS[goal_type]
+                new_goals.append(WellnessGoal(
+                    user_id=user_id,
+                    goal_type=goal_type,
+                    date=date,
+                    title=defaults['title'],
+                    target_value=float(defaults['target_value']),
+                    current_value=0.0,
+                    unit=defaults['unit'],
+                ))
+            try:
+                with transaction.atomic():
+                    WellnessGoal.objects.bulk_create(new_goals)
+                self.goals_created += len(new_goals)
+                created.extend((goal.user_id, goal.date) for goal in new_goals)
+            except DatabaseError:
+                # Another import created some of these goals in the meantime;
+                # fall back to one at a time so only new goals are counted.
+                # get_or_create saves through post_save, which adjusts the
+                # snapshot itself
+                for goal in new_goals:
+                    _, is_new = WellnessGoal.objects.get_or_create(
+                        user_id=goal.user_id, goal_type=goal.goal_type, date=goal.date,
+                        defaults={
+                            'title': goal.title, 'target_value': goal.target_value,
+                            'current_value': 0.0, 'unit': goal.unit,
+                        },
+                    )
+                    self.goals_created += is_new
+            goal_ids.update(self._existing_goal_ids(missing))
+        return goal_ids
+
+    def _existing_goal_ids(self, keys):
+        rows = WellnessGoal.objects.filter(
+            user__in={key[0] for key in keys},
+            goal_type__in={key[1] for key in keys},
+            date__in={key[2] for key in keys},
+        ).order_by().values_list('id', 'user', 'goal_type', 'date')
+        return {
+            (user_id, goal_type, date): goal_id
+            for goal_id, user_id, goal_type, date in rows
+            if (user_id, goal_type, date) in keys
+        }
@@ -0,0 +1,35 @@
+"""
+Management command to move pre-bucketing DailyGoalLog rows into hourly GoalLogBucket records
+Run: python manage.py compact_goal_logs
+"""
+from django.core.management.base import BaseCommand
+from wellness.models import DailyGoalLog, GoalLogBucket, _atomic
+
+
+class Command(BaseCommand):
+    help = 'Compact individual DailyGoalLog rows into hourly GoalLogBucket records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Log rows moved per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        moved = 0
+        while True:
+            # djongo has no transactions, so a run can stop between the
+            # append and the delete; buckets skip rows they already hold, so
+            # the next run only finishes the delete
+            with _atomic(DailyGoalLog.objects):
+                batch = list(DailyGoalLog.objects.order_by('id')[:batch_size])
+                if not batch:
+                    break
+                # Goal totals already include these entries, so only the
+                # storage changes
+                GoalLogBucket.objects.append(batch)
+                DailyGoalLog.objects.filter(id__in=[log.id for log in batch]).delete()
+            moved += len(batch)
+            self.stdout.write(f'  Compacted {moved} log entries...')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {moved} log entries into {GoalLogBucket.objects.count()} buckets'
+        ))
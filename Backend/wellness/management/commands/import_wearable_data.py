@@ -0,0 +1,33 @@
+"""
+Management command to import a wearable data export (NDJSON or CSV)
+Run: python manage.py import_wearable_data export.ndjson
+"""
+from django.core.management.base import BaseCommand, CommandError
+from wellness.ingest import FORMATS, WearableImport, detect_format, read_samples
+
+
+class Command(BaseCommand):
+    help = 'Stream step, sleep and active time samples from an NDJSON/CSV export into wellness goals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Export file; each sample needs user, type, value and timestamp or date')
+        parser.add_argument('--format', choices=FORMATS, help='File format, detected from the extension by default')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Samples written per bulk insert')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        try:
+            stream = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+        
+        importer = WearableImport(chunk_size=options['chunk_size'])
+        with stream:
+            importer.run(read_samples(stream, fmt))
+        
+        for error in importer.errors:
+            self.stdout.write(self.style.WARNING(f"  Sample {error['sample']}: {error['error']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.imported} of {importer.samples} samples '
+            f'({importer.skipped} skipped, {importer.goals_created} goals created)'
+        ))
@@ -0,0 +1,59 @@
+"""
+Management command to pre-create every patient's wellness goals for a day
+Run nightly (e.g. from cron): python manage.py materialize_goals
+"""
+from datetime import date as date_cls, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts.models import User
+from wellness.models import WellnessGoal, GoalRolloverRun
+
+
+class Command(BaseCommand):
+    help = "Create the next day's recurring and default goals for all patients in chunked bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to create goals for (YYYY-MM-DD), defaults to tomorrow')
+        parser.add_argument('--batch-size', type=int, default=500, help='Patients processed per batch')
+        parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint for the day')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                target_date = date_cls.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+        else:
+            target_date = timezone.now().date() + timedelta(days=1)
+        batch_size = options['batch_size']
+        
+        run, created = GoalRolloverRun.objects.get_or_create(date=target_date)
+        if options['restart'] and not created:
+            run.last_user_id = 0
+            run.users_processed = 0
+            run.goals_created = 0
+            run.completed_at = None
+            run.save()
+        elif run.completed_at:
+            self.stdout.write(f'Goals for {target_date} were already created at {run.completed_at}')
+            return
+        elif run.last_user_id:
+            self.stdout.write(f'Resuming goal rollover for {target_date} after user {run.last_user_id}')
+        
+        patient_ids = User.objects.filter(role='patient', is_active=True).order_by('id').values_list('id', flat=True)
+        while True:
+            batch = list(patient_ids.filter(id__gt=run.last_user_id)[:batch_size])
+            if not batch:
+                break
+            run.goals_created += WellnessGoal.objects.materialize_for_users(batch, target_date)
+            run.users_processed += len(batch)
+            run.last_user_id = batch[-1]
+            run.save()
+            self.stdout.write(f'  Processed {run.users_processed} patients...')
+        
+        run.completed_at = timezone.now()
+        run.save()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {run.goals_created} goals for {run.users_processed} patients on {target_date}'
+        ))
@@ -0,0 +1,31 @@
+"""
+Management command to rebuild patient compliance snapshots from raw goals and reminders
+Run: python manage.py rebuild_compliance_snapshots
+"""
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from wellness.models import PatientComplianceSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Rebuild PatientComplianceSnapshot rows for every patient to repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Patients refreshed per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        patient_ids = User.objects.filter(role='patient').order_by('id').values_list('id', flat=True)
+        
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(patient_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            PatientComplianceSnapshot.objects.refresh_for_users(batch)
+            total += len(batch)
+            last_id = batch[-1]
+            self.stdout.write(f'  Refreshed {total} patients...')
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt compliance snapshots for {total} patients'))
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.12 on 2026-10-17 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('wellness', '0003_wellnessgoal_is_recurring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientComplianceSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('today_total', models.PositiveIntegerField(default=0)),
+                ('today_completed', models.PositiveIntegerField(default=0)),
+                ('goals_met', models.PositiveIntegerField(default=0)),
+                ('compliance_status', models.CharField(default='No Goals Set', max_length=20)),
+                ('next_reminder_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='compliance_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
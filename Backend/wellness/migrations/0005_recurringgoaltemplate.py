@@ -0,0 +1,61 @@
+# Generated by Django 3.1.12 on 2026-10-17 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_templates(apps, schema_editor):
+    """Create a template from each user's latest recurring goal of every type"""
+    WellnessGoal = apps.get_model('wellness', 'WellnessGoal')
+    RecurringGoalTemplate = apps.get_model('wellness', 'RecurringGoalTemplate')
+    
+    seen = set()
+    batch = []
+    goals = WellnessGoal.objects.filter(is_recurring=True).order_by('user_id', 'goal_type', '-date')
+    for goal in goals.iterator():
+        key = (goal.user_id, goal.goal_type)
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(RecurringGoalTemplate(
+            user_id=goal.user_id,
+            goal_type=goal.goal_type,
+            title=goal.title,
+            target_value=float(goal.target_value) if goal.target_value else 0,
+            unit=goal.unit,
+            source_date=goal.date,
+        ))
+        if len(batch) >= 500:
+            RecurringGoalTemplate.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RecurringGoalTemplate.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('wellness', '0004_patientcompliancesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringGoalTemplate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goal_type', models.CharField(choices=[('steps', 'Steps'), ('active_time', 'Active Time'), ('sleep', 'Sleep'), ('water', 'Water Intake'), ('calories', 'Calories'), ('custom', 'Custom')], max_length=20)),
+                ('title', models.CharField(max_length=100)),
+                ('target_value', models.FloatField(default=0)),
+                ('unit', models.CharField(default='', max_length=20)),
+                ('source_date', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'goal_type')},
+            },
+        ),
+        migrations.RunPython(backfill_templates, migrations.RunPython.noop),
+    ]
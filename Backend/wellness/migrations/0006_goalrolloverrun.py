@@ -0,0 +1,29 @@
+# Generated by Django 3.1.12 on 2026-10-17 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellness', '0005_recurringgoaltemplate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalRolloverRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('last_user_id', models.PositiveIntegerField(default=0)),
+                ('users_processed', models.PositiveIntegerField(default=0)),
+                ('goals_created', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.1.12 on 2026-10-17 06:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    """Build daily rollups from existing goals, one user-day at a time"""
+    WellnessGoal = apps.get_model('wellness', 'WellnessGoal')
+    GoalDailyRollup = apps.get_model('wellness', 'GoalDailyRollup')
+    
+    # Grouped by completion flag: djongo drops the FILTER of a filtered Count
+    rows = WellnessGoal.objects.order_by('user', 'date').values('user', 'date', 'goal_type', 'is_completed').annotate(
+        goals=Count('id'),
+        current=Sum('current_value'),
+        target=Sum('target_value'),
+    )
+    batch = []
+    rollup = None
+    for row in rows.iterator():
+        if rollup is None or (rollup.user_id, rollup.date) != (row['user'], row['date']):
+            rollup = GoalDailyRollup(
+                user_id=row['user'], date=row['date'], goals=0, completed=0,
+                current_total=0.0, target_total=0.0, by_type={}
+            )
+            batch.append(rollup)
+            if len(batch) > 500:
+                GoalDailyRollup.objects.bulk_create(batch[:-1])
+                batch = batch[-1:]
+        completed = row['goals'] if row['is_completed'] else 0
+        rollup.goals += row['goals']
+        rollup.completed += completed
+        rollup.current_total += row['current'] or 0
+        rollup.target_total += row['target'] or 0
+        stats = rollup.by_type.setdefault(row['goal_type'], {'goals': 0, 'completed': 0, 'current': 0, 'target': 0})
+        stats['goals'] += row['goals']
+        stats['completed'] += completed
+        stats['current'] += row['current'] or 0
+        stats['target'] += row['target'] or 0
+    if batch:
+        GoalDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('wellness', '0007_dailygoallog_logged_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalDailyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('goals', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('current_total', models.FloatField(default=0)),
+                ('target_total', models.FloatField(default=0)),
+                ('by_type', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.12 on 2026-10-17 06:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellness', '0008_goaldailyrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailygoallog',
+            name='goal',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='legacy_logs', to='wellness.wellnessgoal'),
+        ),
+        migrations.CreateModel(
+            name='GoalLogBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('offsets', models.JSONField(default=list)),
+                ('values', models.JSONField(default=list)),
+                ('notes', models.JSONField(default=dict)),
+                ('total', models.FloatField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_buckets', to='wellness.wellnessgoal')),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'unique_together': {('goal', 'bucket_start')},
+            },
+        ),
+    ]
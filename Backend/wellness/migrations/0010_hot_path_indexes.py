@@ -0,0 +1,29 @@
+# Generated by Django 3.1.12 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellness', '0009_goallogbucket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthtip',
+            index=models.Index(fields=['is_active', 'display_date'], name='wellness_he_is_acti_8392a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='preventivecarereminder',
+            index=models.Index(fields=['user', 'status', 'scheduled_date'], name='wellness_pr_user_id_7f7194_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wellnessgoal',
+            index=models.Index(fields=['user', 'date'], name='wellness_we_user_id_7d3223_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wellnessgoal',
+            index=models.Index(fields=['user', 'is_recurring', 'date'], name='wellness_we_user_id_c7fde3_idx'),
+        ),
+    ]
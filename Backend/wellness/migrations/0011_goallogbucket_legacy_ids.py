@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellness', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goallogbucket',
+            name='legacy_ids',
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -1,5 +1,207 @@
-from django.db import models
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import DatabaseError, connections, models, transaction
+from django.db.models import Count, F, Min, Sum
 from django.conf import settings
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+
+def _collection(manager):
+    """The pymongo collection behind ``manager``'s model on a djongo database"""
+    connection = connections[manager.db]
+    connection.ensure_connection()
+    return connection.connection[manager.model._meta.db_table]
+
+
+def _atomic(manager):
+    """transaction.atomic() where the database has transactions.
+
+    djongo has none, but a failed statement would still mark its atomic
+    block for rollback and break every later query in it.
+    """
+    if connections[manager.db].features.supports_transactions:
+        return transaction.atomic(using=manager.db)
+    return nullcontext()
+
+
+def _bulk_update(manager, objs, fields):
+    # djongo cannot translate the CASE expression bulk_update() builds, so
+    # there every object is written with its own update
+    if connections[manager.db].vendor == 'djongo':
+        for obj in objs:
+            manager.filter(pk=obj.pk).update(**{field: getattr(obj, field) for field in fields})
+    else:
+        manager.bulk_update(objs, fields)
+
+
+class WellnessGoalManager(models.Manager):
+    # Goal types created for users that have no recurring goal templates yet
+    DEFAULT_GOAL_TYPES = ['steps', 'active_time', 'sleep']
+    
+    def _increment(self, goal_id, value, user=None):
+        """Add ``value`` to a goal with a server-side update.
+
+        The goal is marked completed server-side as well, by an update that
+        only matches a goal not completed yet, so concurrent increments never
+        overwrite each other and exactly one of them sees the goal complete.
+        Returns None if there is no such goal, otherwise whether this
+        increment completed it.
+        """
+        if connections[self.db].vendor == 'djongo':
+            return self._increment_document(goal_id, value, user)
+        goals = self.filter(pk=goal_id)
+        if user is not None:
+            goals = goals.filter(user=user)
+        if not goals.update(current_value=F('current_value') + value, updated_at=timezone.now()):
+            return None
+        return bool(self.filter(
+            pk=goal_id, is_completed=False, target_value__gt=0, current_value__gte=F('target_value')
+        ).update(is_completed=True))
+    
+    def _increment_document(self, goal_id, value, user=None):
+        # djongo cannot translate UPDATE expressions, so use MongoDB's $inc on
+        # the collection directly. The increment returns the new total, and
+        # only an increment that reaches the target marks the goal completed.
+        connection = connections[self.db]
+        collection = _collection(self)
+        query = {'id': goal_id}
+        if user is not None:
+            query['user_id'] = user.pk
+        goal = collection.find_one_and_update(
+            query,
+            {
+                '$inc': {'current_value': value},
+                '$set': {'updated_at': connection.ops.adapt_datetimefield_value(timezone.now())},
+            },
+            projection={'current_value': True, 'target_value': True, 'is_completed': True},
+            return_document=ReturnDocument.AFTER,
+        )
+        if goal is None:
+            return None
+        if goal['is_completed'] or not 0 < goal['target_value'] <= goal['current_value']:
+            return False
+        result = collection.update_one({'id': goal_id, 'is_completed': False}, {'$set': {'is_completed': True}})
+        return result.modified_count == 1
+    
+    def apply_logs(self, logs):
+        """Store unsaved DailyGoalLog entries and add their totals to the goals.
+
+        Each goal receives one aggregated increment. Callers must have checked
+        that the goals belong to the right users. Returns a dict mapping the
+        ids of the updated goals to whether the increment completed them.
+        """
+        totals = {}
+        for log in logs:
+            totals[log.goal_id] = totals.get(log.goal_id, 0.0) + log.value
+        completed = {}
+        with _atomic(self):
+            for goal_id, total in totals.items():
+                result = self._increment(goal_id, total)
+                if result is not None:
+                    completed[goal_id] = result
+            GoalLogBucket.objects.append(logs)
+        return completed
+    
+    def log_progress(self, goal_id, user, value, notes=''):
+        """Atomically add ``value`` to a goal and record the log entry.
+
+        The entry is written in the same transaction as the increment where
+        the database supports transactions (djongo does not). Returns the
+        updated goal, or None if the user has no such goal.
+        """
+        goal_id = int(goal_id)
+        value = float(value)
+        with _atomic(self):
+            completed = self._increment(goal_id, value, user=user)
+            if completed is None:
+                return None
+            GoalLogBucket.objects.append([DailyGoalLog(goal_id=goal_id, value=value, notes=notes)])
+        goal = self.get(pk=goal_id)
+        
+        # update() bypasses post_save, so refresh derived data explicitly
+        from .signals import goals_updated
+        key = (user.id, goal.date)
+        goals_updated([key], completed=[key] if completed else ())
+        return goal
+    
+    def log_progress_batch(self, user, entries):
+        """Record many log entries across the user's goals in one unit of work.
+
+        ``entries`` are dicts with ``goal_id``, ``value`` and optional ``notes``
+        and ``logged_at``; the goals must belong to ``user``. Returns the
+        updated goals.
+        """
+        logs = []
+        for entry in entries:
+            log = DailyGoalLog(goal_id=entry['goal_id'], value=float(entry['value']), notes=entry.get('notes', ''))
+            if entry.get('logged_at'):
+                log.logged_at = entry['logged_at']
+            logs.append(log)
+        completed = self.apply_logs(logs)
+        goals = list(self.filter(pk__in=completed, user=user))
+        
+        from .signals import goals_updated
+        goals_updated(
+            [(user.id, goal.date) for goal in goals],
+            completed=[(user.id, goal.date) for goal in goals if completed[goal.id]],
+        )
+        return goals
+    
+    def materialize_day(self, user, date):
+        """Create a user's goals for ``date`` from their recurring goal templates"""
+        return self.materialize_for_users([user.id], date)
+    
+    def materialize_for_users(self, user_ids, date):
+        """Create goals for ``date`` for every user that has none yet.
+
+        Goals are built from each user's recurring goal templates, falling back
+        to the default goals (recording templates for them) for users without
+        any. Returns the number of goals inserted.
+        """
+        existing = set(
+            self.filter(user__in=user_ids, date=date).order_by().values_list('user', flat=True).distinct()
+        )
+        user_ids = [user_id for user_id in user_ids if user_id not in existing]
+        if not user_ids:
+            return 0
+        
+        templates_by_user = {}
+        for template in RecurringGoalTemplate.objects.filter(user__in=user_ids):
+            templates_by_user.setdefault(template.user_id, []).append(template)
+        
+        new_templates = []
+        for user_id in user_ids:
+            if user_id not in templates_by_user:
+                templates_by_user[user_id] = [
+                    RecurringGoalTemplate.for_default(user_id, goal_type, date)
+                    for goal_type in self.DEFAULT_GOAL_TYPES
+                ]
+                new_templates.extend(templates_by_user[user_id])
+        if new_templates:
+            RecurringGoalTemplate.objects.bulk_insert(new_templates)
+        
+        goals = [
+            template.build_goal(date)
+            for templates in templates_by_user.values()
+            for template in templates
+        ]
+        # bulk_create bypasses post_save, so refresh derived data explicitly
+        from .signals import goals_updated
+        written = [(user_id, date) for user_id in user_ids]
+        try:
+            with _atomic(self):
+                self.bulk_create(goals, ignore_conflicts=True)
+        except DatabaseError:
+            # djongo ignores ignore_conflicts and fails on the first goal
+            # another run inserted meanwhile. Which of the goals are ours is
+            # unknown, so these users are recounted instead of adjusted
+            PatientComplianceSnapshot.objects.refresh_for_users(user_ids)
+            goals_updated(written)
+            return self.filter(user__in=user_ids, date=date).count()
+        goals_updated(written, created=[(goal.user_id, goal.date) for goal in goals])
+        return len(goals)
 
 
 class WellnessGoal(models.Model):
@@ -39,13 +241,24 @@ class WellnessGoal(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = WellnessGoalManager()
+    
     class Meta:
         ordering = ['-date', 'goal_type']
         unique_together = ['user', 'goal_type', 'date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['user', 'is_recurring', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.title} - {self.date}"
     
+    @property
+    def logs(self):
+        """Log entries for this goal, from hourly buckets and pre-bucketing rows"""
+        return GoalLogs(self)
+    
     @property
     def progress_percentage(self):
         try:
@@ -70,12 +283,115 @@ class WellnessGoal(models.Model):
         super().save(*args, **kwargs)
 
 
+class RecurringGoalTemplateManager(models.Manager):
+    def sync_from_goal(self, goal):
+        """Keep the template for the goal's type pointing at its latest recurring goal"""
+        template = self.filter(user_id=goal.user_id, goal_type=goal.goal_type).first()
+        if goal.is_recurring:
+            if template is None:
+                template = self.model(user_id=goal.user_id, goal_type=goal.goal_type)
+            elif template.source_date > goal.date:
+                return
+            template.copy_from(goal)
+            template.save()
+        elif template is not None and template.source_date == goal.date:
+            # The goal backing this template stopped recurring
+            self.rebuild(goal.user_id, goal.goal_type)
+    
+    def rebuild(self, user_id, goal_type):
+        """Recompute one template from the user's most recent recurring goal of that type"""
+        latest = WellnessGoal.objects.filter(
+            user_id=user_id,
+            goal_type=goal_type,
+            is_recurring=True
+        ).order_by('-date').first()
+        if latest is None:
+            self.filter(user_id=user_id, goal_type=goal_type).delete()
+            return
+        template = self.filter(user_id=user_id, goal_type=goal_type).first()
+        if template is None:
+            template = self.model(user_id=user_id, goal_type=goal_type)
+        template.copy_from(latest)
+        template.save()
+
+    def bulk_insert(self, templates):
+        """Insert ``templates``, keeping the stored one for any user and goal type that already has one"""
+        try:
+            with _atomic(self):
+                self.bulk_create(templates, ignore_conflicts=True)
+        except DatabaseError:
+            # djongo ignores ignore_conflicts and fails on the first template
+            # another writer inserted meanwhile; insert the rest one at a time
+            for template in templates:
+                self.get_or_create(user_id=template.user_id, goal_type=template.goal_type, defaults={
+                    'title': template.title, 'target_value': template.target_value,
+                    'unit': template.unit, 'source_date': template.source_date,
+                })
+
+
+class RecurringGoalTemplate(models.Model):
+    """Latest recurring goal per type for a user, used to roll goals over to a new day"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='goal_templates')
+    goal_type = models.CharField(max_length=20, choices=WellnessGoal.GOAL_TYPE_CHOICES)
+    title = models.CharField(max_length=100)
+    target_value = models.FloatField(default=0)
+    unit = models.CharField(max_length=20, default='')
+    # Date of the recurring goal this template was copied from
+    source_date = models.DateField()
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = RecurringGoalTemplateManager()
+    
+    class Meta:
+        unique_together = ['user', 'goal_type']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.title} (from {self.source_date})"
+    
+    @classmethod
+    def for_default(cls, user_id, goal_type, date):
+        defaults = WellnessGoal.DEFAULT_GOALS.get(goal_type, {})
+        return cls(
+            user_id=user_id,
+            goal_type=goal_type,
+            title=defaults.get('title', goal_type.replace('_', ' ').title()),
+            target_value=float(defaults.get('target_value', 0)),
+            unit=defaults.get('unit', ''),
+            source_date=date,
+        )
+    
+    def copy_from(self, goal):
+        self.title = goal.title
+        self.target_value = float(goal.target_value) if goal.target_value else 0
+        self.unit = goal.unit
+        self.source_date = goal.date
+    
+    def build_goal(self, date):
+        return WellnessGoal(
+            user_id=self.user_id,
+            goal_type=self.goal_type,
+            title=self.title,
+            target_value=float(self.target_value),
+            current_value=0.0,
+            unit=self.unit,
+            date=date,
+            is_recurring=True,
+        )
+
+
 class DailyGoalLog(models.Model):
-    """Log individual entries for goals throughout the day"""
-    goal = models.ForeignKey(WellnessGoal, on_delete=models.CASCADE, related_name='logs')
+    """Log individual entries for goals throughout the day.
+
+    New entries are stored in GoalLogBucket; instances are still used as the
+    in-memory form of an entry and rows written before bucketing remain
+    readable through ``WellnessGoal.logs``.
+    """
+    goal = models.ForeignKey(WellnessGoal, on_delete=models.CASCADE, related_name='legacy_logs')
     value = models.FloatField(default=0)  # Changed from DecimalField to FloatField
     notes = models.TextField(blank=True, null=True)
-    logged_at = models.DateTimeField(auto_now_add=True)
+    # Defaults to now, but batch syncs from wearables supply the reading time
+    logged_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-logged_at']
@@ -92,6 +408,153 @@ class DailyGoalLog(models.Model):
         super().save(*args, **kwargs)
 
 
+class GoalLogBucketManager(models.Manager):
+    def append(self, logs):
+        """Add unsaved DailyGoalLog entries to their goal's hourly buckets.
+
+        Buckets are extended with a compare-and-set on their entry count and
+        retried when another writer got there first, so concurrent appends
+        are never lost. This relies on neither row locks nor transactions,
+        which djongo does not have.
+
+        Saved logs (legacy DailyGoalLog rows being compacted) are recorded
+        by id in their bucket and skipped if appended again.
+        """
+        grouped = {}
+        for log in logs:
+            logged_at = log.logged_at or timezone.now()
+            key = (log.goal_id, self.model.bucket_start_for(logged_at))
+            grouped.setdefault(key, []).append((logged_at, float(log.value), log.notes, log.pk))
+        if not grouped:
+            return
+        
+        existing = {
+            (bucket.goal_id, bucket.bucket_start): bucket
+            for bucket in self.filter(
+                goal_id__in={key[0] for key in grouped},
+                bucket_start__in={key[1] for key in grouped},
+            )
+        }
+        for key, entries in grouped.items():
+            self._extend(key, entries, existing.get(key))
+    
+    def _extend(self, key, entries, bucket=None):
+        """Add entries to the bucket for ``key``, creating it if needed.
+
+        ``bucket`` is the bucket as last read, or None if it did not exist.
+        """
+        goal_id, bucket_start = key
+        while True:
+            if bucket is not None:
+                compacted = set(bucket.legacy_ids)
+                entries = [entry for entry in entries if entry[3] is None or entry[3] not in compacted]
+                if not entries:
+                    return
+            if bucket is None:
+                bucket = self.model(goal_id=goal_id, bucket_start=bucket_start)
+                for entry in entries:
+                    bucket.add(*entry)
+                try:
+                    with _atomic(self):
+                        bucket.save(force_insert=True)
+                    return
+                except DatabaseError:
+                    # Another writer created the bucket first; extend theirs
+                    bucket = self.filter(goal_id=goal_id, bucket_start=bucket_start).first()
+                    if bucket is None:
+                        raise
+                    continue
+            
+            count = bucket.count
+            for entry in entries:
+                bucket.add(*entry)
+            updated = self.filter(pk=bucket.pk, count=count).update(
+                offsets=bucket.offsets, values=bucket.values, notes=bucket.notes,
+                total=bucket.total, count=bucket.count, legacy_ids=bucket.legacy_ids,
+            )
+            if updated:
+                return
+            bucket = self.filter(goal_id=goal_id, bucket_start=bucket_start).first()
+
+
+class GoalLogBucket(models.Model):
+    """All log entries for one goal within one hour, stored as parallel arrays"""
+    BUCKET_SECONDS = 3600
+    
+    goal = models.ForeignKey(WellnessGoal, on_delete=models.CASCADE, related_name='log_buckets')
+    bucket_start = models.DateTimeField()
+    # Seconds from bucket_start and the logged value of each entry
+    offsets = models.JSONField(default=list)
+    values = models.JSONField(default=list)
+    # Notes keyed by entry index, only for entries that have one
+    notes = models.JSONField(default=dict)
+    total = models.FloatField(default=0)
+    count = models.PositiveIntegerField(default=0)
+    # Ids of the DailyGoalLog rows compacted into this bucket, so a
+    # compaction interrupted before deleting them does not add them twice
+    legacy_ids = models.JSONField(default=list)
+    
+    objects = GoalLogBucketManager()
+    
+    class Meta:
+        ordering = ['-bucket_start']
+        unique_together = ['goal', 'bucket_start']
+    
+    def __str__(self):
+        return f"{self.goal_id} - {self.count} entries from {self.bucket_start}"
+    
+    @classmethod
+    def bucket_start_for(cls, logged_at):
+        epoch = int(logged_at.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % cls.BUCKET_SECONDS, tz=dt_timezone.utc)
+    
+    def add(self, logged_at, value, notes=None, legacy_id=None):
+        if legacy_id is not None:
+            self.legacy_ids.append(legacy_id)
+        if notes:
+            self.notes[str(len(self.values))] = notes
+        self.offsets.append(round((logged_at - self.bucket_start).total_seconds(), 3))
+        self.values.append(value)
+        self.total += value
+        self.count += 1
+    
+    def entries(self):
+        return [
+            DailyGoalLog(
+                goal_id=self.goal_id,
+                value=value,
+                notes=self.notes.get(str(index)),
+                logged_at=self.bucket_start + timedelta(seconds=offset),
+            )
+            for index, (offset, value) in enumerate(zip(self.offsets, self.values))
+        ]
+
+
+class GoalLogs:
+    """Read-only view of a goal's log entries across buckets and legacy rows"""
+    
+    def __init__(self, goal):
+        self.goal = goal
+    
+    def all(self):
+        """Unsaved DailyGoalLog instances, newest first"""
+        entries = list(self.goal.legacy_logs.all())
+        for bucket in self.goal.log_buckets.all():
+            entries.extend(bucket.entries())
+        entries.sort(key=lambda entry: entry.logged_at, reverse=True)
+        return entries
+    
+    def count(self):
+        bucketed = self.goal.log_buckets.aggregate(total=Sum('count'))['total'] or 0
+        return bucketed + self.goal.legacy_logs.count()
+    
+    def __iter__(self):
+        return iter(self.all())
+    
+    def __len__(self):
+        return self.count()
+
+
 class PreventiveCareReminder(models.Model):
     REMINDER_TYPE_CHOICES = [
         ('blood_test', 'Blood Test'),
@@ -129,11 +592,30 @@ class PreventiveCareReminder(models.Model):
     
     class Meta:
         ordering = ['scheduled_date', 'scheduled_time']
+        indexes = [
+            models.Index(fields=['user', 'status', 'scheduled_date']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.title} - {self.scheduled_date}"
 
 
+class HealthTipManager(models.Manager):
+    def for_day(self, date):
+        """The tip to show on ``date``: a tip scheduled for that day, otherwise
+        an active tip picked by the day's ordinal, so every request on the
+        same day gets the same tip. Loads at most one tip.
+        """
+        active = self.filter(is_active=True)
+        tip = active.filter(display_date=date).order_by('-created_at').first()
+        if tip is not None:
+            return tip
+        count = active.count()
+        if not count:
+            return None
+        return active.order_by('pk')[date.toordinal() % count]
+
+
 class HealthTip(models.Model):
     CATEGORY_CHOICES = [
         ('nutrition', 'Nutrition'),
@@ -152,8 +634,307 @@ class HealthTip(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = HealthTipManager()
+    
     class Meta:
         ordering = ['-display_date', '-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'display_date']),
+        ]
     
     def __str__(self):
         return self.title
+
+
+class PatientComplianceSnapshotManager(models.Manager):
+    def refresh_for_users(self, user_ids, today=None, create=True):
+        """Recompute snapshots for the given users from their goals and reminders.
+
+        Returns a dict of snapshots keyed by user id. Users without a snapshot
+        are skipped when ``create`` is False.
+        """
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        today = today or timezone.now().date()
+        
+        # Grouped by completion flag rather than counted with filtered
+        # aggregates, whose FILTER clause djongo silently drops
+        goal_counts = {user_id: {'today_total': 0, 'today_completed': 0, 'goals_met': 0} for user_id in user_ids}
+        goals = WellnessGoal.objects.filter(user__in=user_ids).order_by()
+        for row in goals.values('user', 'is_completed').annotate(goals=Count('id')):
+            if row['is_completed']:
+                goal_counts[row['user']]['goals_met'] += row['goals']
+        for row in goals.filter(date=today).values('user', 'is_completed').annotate(goals=Count('id')):
+            goal_counts[row['user']]['today_total'] += row['goals']
+            if row['is_completed']:
+                goal_counts[row['user']]['today_completed'] += row['goals']
+        next_reminders = {
+            row['user']: row['next_date']
+            for row in PreventiveCareReminder.objects.filter(
+                user__in=user_ids,
+                status='upcoming',
+                scheduled_date__gte=today
+            ).order_by().values('user').annotate(next_date=Min('scheduled_date'))
+        }
+        
+        snapshots = {s.user_id: s for s in self.filter(user__in=user_ids)}
+        to_create = []
+        for user_id in user_ids:
+            counts = goal_counts[user_id]
+            snapshot = snapshots.get(user_id)
+            if snapshot is None:
+                if not create:
+                    continue
+                snapshot = self.model(user_id=user_id)
+                snapshots[user_id] = snapshot
+                to_create.append(snapshot)
+            snapshot.date = today
+            snapshot.today_total = counts['today_total']
+            snapshot.today_completed = counts['today_completed']
+            snapshot.goals_met = counts['goals_met']
+            snapshot.compliance_status = self.model.status_for(
+                snapshot.today_total, snapshot.today_completed
+            )
+            snapshot.next_reminder_date = next_reminders.get(user_id)
+            snapshot.updated_at = timezone.now()
+        
+        to_update = [s for s in snapshots.values() if s.pk is not None]
+        if to_update:
+            _bulk_update(self, to_update, [
+                'date', 'today_total', 'today_completed', 'goals_met',
+                'compliance_status', 'next_reminder_date', 'updated_at'
+            ])
+        if to_create:
+            self.bulk_create(to_create)
+        return snapshots
+    
+    def _current(self, user_id, today, create):
+        """The user's snapshot if it is for ``today``; otherwise it is rebuilt and None returned"""
+        snapshot = self.filter(user_id=user_id).first()
+        if snapshot is None or snapshot.date != today:
+            self.refresh_for_users([user_id], today, create=create)
+            return None
+        return snapshot
+    
+    def apply_goal_change(self, user_id, before, after, today=None):
+        """Adjust a user's snapshot for one goal changing from ``before`` to ``after``.
+
+        Both are ``(date, is_completed)`` pairs, or None when the goal did not
+        exist before or no longer exists. Only a missing or out of date
+        snapshot is recounted from the goals.
+        """
+        self.apply_goal_changes(user_id, [(before, after)], today)
+    
+    def apply_goal_changes(self, user_id, changes, today=None):
+        """Adjust a user's snapshot for several ``(before, after)`` goal changes at once.
+
+        Changes that touch neither today's goals nor a completed goal leave
+        the snapshot as it is and are skipped without reading it.
+        """
+        today = today or timezone.now().date()
+        
+        def counted(state):
+            return state is not None and (state[0] == today or state[1])
+        
+        changes = [(before, after) for before, after in changes if before != after and (counted(before) or counted(after))]
+        if not changes:
+            return
+        snapshot = self._current(user_id, today, create=any(after is not None for _, after in changes))
+        if snapshot is None:
+            return
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                date, completed = state
+                snapshot.goals_met = max(0, snapshot.goals_met + sign * completed)
+                if date == today:
+                    snapshot.today_total = max(0, snapshot.today_total + sign)
+                    snapshot.today_completed = max(0, snapshot.today_completed + sign * completed)
+        # update() rather than save(): the snapshot may be going away in the
+        # same cascade as the goal
+        self.filter(pk=snapshot.pk).update(
+            today_total=snapshot.today_total,
+            today_completed=snapshot.today_completed,
+            goals_met=snapshot.goals_met,
+            compliance_status=self.model.status_for(snapshot.today_total, snapshot.today_completed),
+            updated_at=timezone.now(),
+        )
+    
+    def apply_reminder_change(self, user_id, before, after, today=None):
+        """Adjust a user's next reminder date for one reminder changing from ``before`` to ``after``.
+
+        Both are ``(scheduled_date, status)`` pairs, or None when the reminder
+        did not exist before or no longer exists. The user's reminders are
+        only queried when the reminder that was next moves later or goes away.
+        """
+        if before == after:
+            return
+        today = today or timezone.now().date()
+        snapshot = self._current(user_id, today, create=after is not None)
+        if snapshot is None:
+            return
+        
+        def pending(state):
+            return state is not None and state[1] == 'upcoming' and state[0] >= today
+        
+        next_date = snapshot.next_reminder_date
+        if pending(before) and before[0] == next_date and not (pending(after) and after[0] <= next_date):
+            next_date = PreventiveCareReminder.objects.filter(
+                user_id=user_id,
+                status='upcoming',
+                scheduled_date__gte=today
+            ).aggregate(next_date=Min('scheduled_date'))['next_date']
+        elif pending(after) and (next_date is None or after[0] < next_date):
+            next_date = after[0]
+        else:
+            return
+        self.filter(pk=snapshot.pk).update(next_reminder_date=next_date, updated_at=timezone.now())
+
+
+class PatientComplianceSnapshot(models.Model):
+    """Denormalized per-patient compliance summary read by the provider views"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='compliance_snapshot')
+    # Day the today_* counts and compliance status refer to
+    date = models.DateField()
+    today_total = models.PositiveIntegerField(default=0)
+    today_completed = models.PositiveIntegerField(default=0)
+    goals_met = models.PositiveIntegerField(default=0)
+    compliance_status = models.CharField(max_length=20, default='No Goals Set')
+    next_reminder_date = models.DateField(blank=True, null=True)
+    
+    updated_at = models.DateTimeField(default=timezone.now)
+    
+    objects = PatientComplianceSnapshotManager()
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.compliance_status} - {self.date}"
+    
+    @staticmethod
+    def status_for(total, completed):
+        if not total:
+            return 'No Goals Set'
+        if completed == total:
+            return 'Goal Met'
+        elif completed > 0:
+            return 'In Progress'
+        return 'Missed'
+    
+    @property
+    def is_current(self):
+        return self.date == timezone.now().date()
+
+
+class GoalRolloverRun(models.Model):
+    """Progress checkpoint for the batch job that pre-creates a day's goals"""
+    date = models.DateField(unique=True)
+    last_user_id = models.PositiveIntegerField(default=0)
+    users_processed = models.PositiveIntegerField(default=0)
+    goals_created = models.PositiveIntegerField(default=0)
+    
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-date']
+    
+    def __str__(self):
+        state = 'completed' if self.completed_at else f'at user {self.last_user_id}'
+        return f"Goal rollover for {self.date} ({state})"
+
+
+class GoalDailyRollupManager(models.Manager):
+    def refresh(self, user_ids, dates, create=True):
+        """Recompute the rollups for every given user on every given date.
+
+        Missing rollups are only inserted when ``create`` is True.
+        """
+        user_ids, dates = set(user_ids), set(dates)
+        if not user_ids or not dates:
+            return
+        
+        rollups = {}
+        # Grouped by completion flag rather than counted with a filtered
+        # aggregate, whose FILTER clause djongo silently drops
+        rows = WellnessGoal.objects.filter(user__in=user_ids, date__in=dates).order_by().values(
+            'user', 'date', 'goal_type', 'is_completed'
+        ).annotate(
+            goals=Count('id'),
+            current=Sum('current_value'),
+            target=Sum('target_value'),
+        )
+        for row in rows:
+            self.model.add_goals(rollups, row)
+        
+        existing = self.filter(user__in=user_ids, date__in=dates)
+        to_update = []
+        stale_ids = []
+        for current in existing:
+            rollup = rollups.pop((current.user_id, current.date), None)
+            if rollup is None:
+                stale_ids.append(current.pk)
+            else:
+                rollup.pk = current.pk
+                to_update.append(rollup)
+        if stale_ids:
+            self.filter(pk__in=stale_ids).delete()
+        if to_update:
+            _bulk_update(self, to_update, ['goals', 'completed', 'current_total', 'target_total', 'by_type'])
+        if rollups and create:
+            try:
+                with _atomic(self):
+                    self.bulk_create(rollups.values(), ignore_conflicts=True)
+            except DatabaseError:
+                # djongo ignores ignore_conflicts: another writer inserted
+                # some of these rollups first, so write each one on its own
+                for rollup in rollups.values():
+                    self.update_or_create(user_id=rollup.user_id, date=rollup.date, defaults={
+                        field: getattr(rollup, field)
+                        for field in ('goals', 'completed', 'current_total', 'target_total', 'by_type')
+                    })
+
+
+class GoalDailyRollup(models.Model):
+    """Per user per day goal totals, read by the history endpoint instead of raw goals"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='goal_rollups')
+    date = models.DateField()
+    goals = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    current_total = models.FloatField(default=0)
+    target_total = models.FloatField(default=0)
+    # {goal_type: {'goals', 'completed', 'current', 'target'}}
+    by_type = models.JSONField(default=dict)
+    
+    objects = GoalDailyRollupManager()
+    
+    class Meta:
+        ordering = ['date']
+        unique_together = ['user', 'date']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.completed}/{self.goals})"
+    
+    @classmethod
+    def add_goals(cls, rollups, row):
+        """Add one row of goals grouped by user, date, goal type and completion to ``rollups``,
+        a dict of unsaved rollups keyed by (user id, date).
+        """
+        rollup = rollups.get((row['user'], row['date']))
+        if rollup is None:
+            rollup = rollups[row['user'], row['date']] = cls(
+                user_id=row['user'], date=row['date'], goals=0, completed=0,
+                current_total=0.0, target_total=0.0, by_type={}
+            )
+        completed = row['goals'] if row['is_completed'] else 0
+        current, target = row['current'] or 0, row['target'] or 0
+        rollup.goals += row['goals']
+        rollup.completed += completed
+        rollup.current_total += current
+        rollup.target_total += target
+        stats = rollup.by_type.setdefault(row['goal_type'], {'goals': 0, 'completed': 0, 'current': 0, 'target': 0})
+        stats['goals'] += row['goals']
+        stats['completed'] += completed
+        stats['current'] += current
+        stats['target'] += target
@@ -75,6 +75,14 @@ class LogGoalProgressSerializer(serializers.Serializer):
     notes = serializers.CharField(required=False, allow_blank=True)
 
 
+class BatchLogGoalProgressSerializer(LogGoalProgressSerializer):
+    """One entry of a batch progress log request"""
+    MAX_ENTRIES = 5000
+    
+    goal_id = serializers.IntegerField()
+    logged_at = serializers.DateTimeField(required=False)
+
+
 class PreventiveCareReminderSerializer(serializers.ModelSerializer):
     scheduled_time = serializers.TimeField(required=False, allow_null=True)
     recurrence_interval = serializers.IntegerField(required=False, allow_null=True)
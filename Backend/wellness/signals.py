@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as dashboard_cache
+from .models import (
+    WellnessGoal, PreventiveCareReminder, HealthTip, PatientComplianceSnapshot,
+    RecurringGoalTemplate, GoalDailyRollup
+)
+
+
+def goals_updated(written, completed=(), created=()):
+    """Refresh data derived from goals written by code paths that bypass the
+    model signals below (queryset ``update()`` and ``bulk_create()``).
+
+    Every argument holds ``(user_id, date)`` pairs: ``written`` for every goal
+    written, ``completed`` for goals an increment just completed and
+    ``created`` for goals just inserted. The snapshots are adjusted by the
+    difference rather than recounted.
+    """
+    changes = {}
+    for user_id, date in created:
+        changes.setdefault(user_id, []).append((None, (date, False)))
+    for user_id, date in completed:
+        changes.setdefault(user_id, []).append(((date, False), (date, True)))
+    for user_id, user_changes in changes.items():
+        PatientComplianceSnapshot.objects.apply_goal_changes(user_id, user_changes)
+
+    written = set(written) | set(completed) | set(created)
+    user_ids = {user_id for user_id, _ in written}
+    if written:
+        GoalDailyRollup.objects.refresh(user_ids, {date for _, date in written})
+    dashboard_cache.invalidate(user_ids)
+
+
+def _goal_state(goal):
+    # Read from __dict__ so a deferred field is not loaded just for this
+    date, completed = goal.__dict__.get('date'), goal.__dict__.get('is_completed')
+    return None if date is None or completed is None else (date, bool(completed))
+
+
+def _reminder_state(reminder):
+    date, status = reminder.__dict__.get('scheduled_date'), reminder.__dict__.get('status')
+    return None if date is None or status is None else (date, status)
+
+
+@receiver(post_init, sender=WellnessGoal)
+def remember_goal_state(sender, instance, **kwargs):
+    # Saves adjust the compliance snapshot by the difference from this state
+    instance._saved_state = _goal_state(instance) if instance.pk else None
+
+
+@receiver(post_init, sender=PreventiveCareReminder)
+def remember_reminder_state(sender, instance, **kwargs):
+    instance._saved_state = _reminder_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=WellnessGoal)
+def refresh_on_goal_save(sender, instance, created, **kwargs):
+    before, after = instance._saved_state, _goal_state(instance)
+    if before is None and not created:
+        # Loaded without the tracked fields, so the change is unknown
+        PatientComplianceSnapshot.objects.refresh_for_users([instance.user_id])
+    else:
+        PatientComplianceSnapshot.objects.apply_goal_change(instance.user_id, before, after)
+    dates = {after[0]} | ({before[0]} if before else set())
+    GoalDailyRollup.objects.refresh([instance.user_id], dates)
+    dashboard_cache.invalidate([instance.user_id])
+    instance._saved_state = after
+
+
+@receiver(post_save, sender=PreventiveCareReminder)
+def refresh_on_reminder_save(sender, instance, created, **kwargs):
+    before, after = instance._saved_state, _reminder_state(instance)
+    if before is None and not created:
+        PatientComplianceSnapshot.objects.refresh_for_users([instance.user_id])
+    else:
+        PatientComplianceSnapshot.objects.apply_reminder_change(instance.user_id, before, after)
+    dashboard_cache.invalidate([instance.user_id])
+    instance._saved_state = after
+
+
+@receiver(post_delete, sender=WellnessGoal)
+def refresh_on_goal_delete(sender, instance, **kwargs):
+    # Deletes may be cascading from the user itself, so never create rows here
+    PatientComplianceSnapshot.objects.apply_goal_change(instance.user_id, instance._saved_state, None)
+    GoalDailyRollup.objects.refresh([instance.user_id], [instance.date], create=False)
+    dashboard_cache.invalidate([instance.user_id])
+
+
+@receiver(post_delete, sender=PreventiveCareReminder)
+def refresh_on_reminder_delete(sender, instance, **kwargs):
+    PatientComplianceSnapshot.objects.apply_reminder_change(instance.user_id, instance._saved_state, None)
+    dashboard_cache.invalidate([instance.user_id])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_on_user_save(sender, instance, **kwargs):
+    # The dashboard summary includes the user's name
+    dashboard_cache.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=HealthTip)
+@receiver(post_delete, sender=HealthTip)
+def invalidate_tip_of_day(sender, instance, **kwargs):
+    dashboard_cache.invalidate_tip()
+
+
+@receiver(post_save, sender=WellnessGoal)
+def sync_goal_template(sender, instance, **kwargs):
+    RecurringGoalTemplate.objects.sync_from_goal(instance)
+
+
+@receiver(post_delete, sender=WellnessGoal)
+def rebuild_goal_template(sender, instance, **kwargs):
+    template = RecurringGoalTemplate.objects.filter(
+        user_id=instance.user_id,
+        goal_type=instance.goal_type,
+        source_date=instance.date
+    ).first()
+    if template is not None:
+        RecurringGoalTemplate.objects.rebuild(instance.user_id, instance.goal_type)
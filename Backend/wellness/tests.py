@@ -1,3 +1,1008 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from . import cache as dashboard_cache
+from .ingest import WearableImport
+from .models import (
+    WellnessGoal, DailyGoalLog, PreventiveCareReminder, HealthTip, PatientComplianceSnapshot,
+    RecurringGoalTemplate, GoalRolloverRun, GoalDailyRollup, GoalLogBucket
+)
+
+
+class PatientComplianceSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.today = timezone.now().date()
+
+    def test_goal_save_updates_snapshot(self):
+        goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='steps', title='Daily Steps',
+            target_value=100, date=self.today
+        )
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.compliance_status, 'Missed')
+        self.assertEqual(snapshot.today_total, 1)
+
+        goal.current_value = 100
+        goal.save()
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.compliance_status, 'Goal Met')
+        self.assertEqual(snapshot.goals_met, 1)
+
+    def test_reminder_changes_update_next_reminder_date(self):
+        later = PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='checkup', title='Checkup',
+            scheduled_date=self.today + timedelta(days=10)
+        )
+        sooner = PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='dental', title='Dentist',
+            scheduled_date=self.today + timedelta(days=3)
+        )
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.next_reminder_date, sooner.scheduled_date)
+
+        sooner.delete()
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.next_reminder_date, later.scheduled_date)
+
+    def test_refresh_counts_completed_goals_separately(self):
+        WellnessGoal.objects.bulk_create([
+            WellnessGoal(user=self.user, goal_type='steps', title='Steps', target_value=100, date=self.today),
+            WellnessGoal(
+                user=self.user, goal_type='sleep', title='Sleep', target_value=8, current_value=8,
+                is_completed=True, date=self.today
+            ),
+            WellnessGoal(
+                user=self.user, goal_type='steps', title='Steps', target_value=100, current_value=100,
+                is_completed=True, date=self.today - timedelta(days=1)
+            ),
+        ])
+
+        snapshot = PatientComplianceSnapshot.objects.refresh_for_users([self.user.id])[self.user.id]
+
+        self.assertEqual(snapshot.today_total, 2)
+        self.assertEqual(snapshot.today_completed, 1)
+        self.assertEqual(snapshot.goals_met, 2)
+        self.assertEqual(snapshot.compliance_status, 'In Progress')
+
+    def test_goal_changes_adjust_snapshot_without_recounting(self):
+        goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='steps', title='Daily Steps',
+            target_value=100, date=self.today
+        )
+        goal.current_value = 100
+        with mock.patch.object(PatientComplianceSnapshot.objects, 'refresh_for_users') as refresh:
+            goal.save()
+        refresh.assert_not_called()
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual((snapshot.today_total, snapshot.today_completed, snapshot.goals_met), (1, 1, 1))
+        self.assertEqual(snapshot.compliance_status, 'Goal Met')
+
+        goal.delete()
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual((snapshot.today_total, snapshot.today_completed, snapshot.goals_met), (0, 0, 0))
+        self.assertEqual(snapshot.compliance_status, 'No Goals Set')
+
+    def test_rescheduling_next_reminder_finds_the_new_next(self):
+        first = PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='checkup', title='Checkup',
+            scheduled_date=self.today + timedelta(days=2)
+        )
+        second = PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='dental', title='Dentist',
+            scheduled_date=self.today + timedelta(days=5)
+        )
+
+        first.scheduled_date = self.today + timedelta(days=9)
+        first.save()
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.next_reminder_date, second.scheduled_date)
+
+        second.status = 'completed'
+        second.save()
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.next_reminder_date, first.scheduled_date)
+
+    def test_rebuild_command_repairs_drift(self):
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep',
+            target_value=8, current_value=8, date=self.today
+        )
+        PatientComplianceSnapshot.objects.filter(user=self.user).update(
+            goals_met=0, compliance_status='Missed', date=self.today - timedelta(days=1)
+        )
+
+        call_command('rebuild_compliance_snapshots', stdout=StringIO())
+
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.date, self.today)
+        self.assertEqual(snapshot.goals_met, 1)
+        self.assertEqual(snapshot.compliance_status, 'Goal Met')
+
+
+class TodayGoalsViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('today_goals')
+        self.today = timezone.now().date()
+
+    def test_creates_default_goals_for_new_user(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            sorted(goal['goal_type'] for goal in response.data),
+            ['active_time', 'sleep', 'steps']
+        )
+        self.assertEqual(RecurringGoalTemplate.objects.filter(user=self.user).count(), 3)
+
+    def test_rolls_over_latest_recurring_goal_per_type(self):
+        for days_ago, target in [(5, 5000), (2, 7000)]:
+            WellnessGoal.objects.create(
+                user=self.user, goal_type='steps', title='Steps', target_value=target,
+                date=self.today - timedelta(days=days_ago), is_recurring=True
+            )
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='water', title='Water', target_value=8,
+            unit='glasses', date=self.today - timedelta(days=3), is_recurring=True
+        )
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='calories', title='Calories', target_value=400,
+            date=self.today - timedelta(days=1)
+        )
+
+        response = self.client.get(self.url)
+
+        goals = {goal['goal_type']: goal for goal in response.data}
+        self.assertEqual(sorted(goals), ['steps', 'water'])
+        self.assertEqual(goals['steps']['target_value'], 7000)
+        self.assertEqual(goals['steps']['current_value'], 0)
+        self.assertTrue(goals['water']['is_recurring'])
+
+    def test_template_falls_back_when_latest_goal_stops_recurring(self):
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=7,
+            date=self.today - timedelta(days=4), is_recurring=True
+        )
+        latest = WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=9,
+            date=self.today - timedelta(days=1), is_recurring=True
+        )
+
+        latest.is_recurring = False
+        latest.save()
+
+        template = RecurringGoalTemplate.objects.get(user=self.user, goal_type='sleep')
+        self.assertEqual(template.target_value, 7)
+
+        WellnessGoal.objects.filter(user=self.user, goal_type='sleep', is_recurring=True).delete()
+        self.assertFalse(RecurringGoalTemplate.objects.filter(user=self.user).exists())
+
+
+class MaterializeGoalsCommandTests(TestCase):
+    def setUp(self):
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.patients = [
+            User.objects.create_user(email=f'patient{i}@example.com', password='pass')
+            for i in range(5)
+        ]
+        User.objects.create_user(email='provider@example.com', password='pass', role='provider')
+
+    def test_creates_goals_for_every_patient(self):
+        WellnessGoal.objects.create(
+            user=self.patients[0], goal_type='water', title='Water', target_value=10,
+            date=timezone.now().date(), is_recurring=True
+        )
+
+        call_command('materialize_goals', '--batch-size=2', stdout=StringIO())
+
+        goals = WellnessGoal.objects.filter(date=self.tomorrow)
+        self.assertEqual(goals.filter(user=self.patients[0]).get().goal_type, 'water')
+        self.assertEqual(goals.count(), 1 + 3 * 4)
+        self.assertFalse(goals.filter(user__role='provider').exists())
+        run = GoalRolloverRun.objects.get(date=self.tomorrow)
+        self.assertIsNotNone(run.completed_at)
+        self.assertEqual(run.users_processed, 5)
+
+    def test_resumes_from_checkpoint(self):
+        GoalRolloverRun.objects.create(date=self.tomorrow, last_user_id=self.patients[2].id, users_processed=3)
+
+        call_command('materialize_goals', stdout=StringIO())
+
+        created_for = set(WellnessGoal.objects.filter(date=self.tomorrow).values_list('user', flat=True))
+        self.assertEqual(created_for, {self.patients[3].id, self.patients[4].id})
+        self.assertEqual(GoalRolloverRun.objects.get(date=self.tomorrow).users_processed, 5)
+
+    def test_existing_goals_are_left_untouched(self):
+        WellnessGoal.objects.create(
+            user=self.patients[1], goal_type='steps', title='Steps', target_value=100,
+            current_value=40, date=self.tomorrow
+        )
+
+        call_command('materialize_goals', stdout=StringIO())
+        call_command('materialize_goals', stdout=StringIO())
+
+        goals = WellnessGoal.objects.filter(user=self.patients[1], date=self.tomorrow)
+        self.assertEqual(goals.get().current_value, 40)
+
+    def test_goals_for_another_day_leave_snapshots_alone(self):
+        with mock.patch.object(PatientComplianceSnapshot.objects, 'refresh_for_users') as refresh:
+            call_command('materialize_goals', stdout=StringIO())
+
+        refresh.assert_not_called()
+        self.assertFalse(PatientComplianceSnapshot.objects.exists())
+
+    def test_duplicate_inserts_are_recovered(self):
+        # djongo ignores ignore_conflicts and raises on the first duplicate,
+        # after inserting the rows before it
+        insert_goals = WellnessGoal.objects.bulk_create
+
+        def racing_insert(goals, **kwargs):
+            insert_goals(goals[:1])
+            raise DatabaseError('duplicate key')
+
+        user = self.patients[0]
+        with mock.patch.object(RecurringGoalTemplate.objects, 'bulk_create', side_effect=DatabaseError), \
+                mock.patch.object(WellnessGoal.objects, 'bulk_create', side_effect=racing_insert):
+            inserted = WellnessGoal.objects.materialize_for_users([user.id], timezone.now().date())
+
+        # SQLite rolls the partial insert back; djongo keeps it
+        stored = WellnessGoal.objects.filter(user=user).count()
+        self.assertEqual(inserted, stored)
+        self.assertEqual(RecurringGoalTemplate.objects.filter(user=user).count(), 3)
+        self.assertEqual(PatientComplianceSnapshot.objects.get(user=user).today_total, stored)
+
+
+class WeeklyProgressViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('weekly_progress')
+        today = timezone.now().date()
+        for days_ago, steps in [(0, 3000), (1, 7000), (2, 6000)]:
+            WellnessGoal.objects.create(
+                user=self.user, goal_type='steps', title='Steps', target_value=6000,
+                current_value=steps, date=today - timedelta(days=days_ago)
+            )
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=8,
+            current_value=6, date=today - timedelta(days=1)
+        )
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=8,
+            current_value=8, date=today - timedelta(days=30)
+        )
+
+    def test_summary_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        data = response.data
+        self.assertEqual(data['total_goals'], 4)
+        self.assertEqual(data['completed_goals'], 2)
+        self.assertEqual(data['completion_rate'], 50.0)
+        self.assertEqual(data['steps_summary'], {'total': 16000, 'target': 18000})
+        self.assertEqual(data['by_type']['steps']['average'], 5333.33)
+        self.assertEqual(data['by_type']['sleep']['completed'], 0)
+        self.assertEqual(len(data['daily']), 8)
+        self.assertEqual(data['daily'][-2], {'date': timezone.now().date() - timedelta(days=1), 'goals': 2, 'completed': 1})
+        self.assertNotIn('goals', data)
+
+    def test_goal_list_is_optional(self):
+        response = self.client.get(self.url, {'include_goals': 'true'})
+
+        self.assertEqual(len(response.data['goals']), 4)
+
+
+class GoalHistoryViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('goal_history')
+        # 2025-03-03 is a Monday
+        for day, steps in [(date(2025, 3, 3), 7000), (date(2025, 3, 5), 3000), (date(2025, 3, 10), 6000)]:
+            WellnessGoal.objects.create(
+                user=self.user, goal_type='steps', title='Steps', target_value=6000,
+                current_value=steps, date=day
+            )
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=8,
+            current_value=8, date=date(2025, 3, 5)
+        )
+
+    def test_rollups_follow_goal_writes(self):
+        rollup = GoalDailyRollup.objects.get(user=self.user, date=date(2025, 3, 5))
+        self.assertEqual((rollup.goals, rollup.completed), (2, 1))
+        self.assertEqual(rollup.by_type['steps']['current'], 3000)
+
+        goal = WellnessGoal.objects.get(user=self.user, goal_type='steps', date=date(2025, 3, 5))
+        WellnessGoal.objects.log_progress(goal.id, self.user, 3000)
+        rollup.refresh_from_db()
+        self.assertEqual((rollup.goals, rollup.completed), (2, 2))
+
+        WellnessGoal.objects.filter(date=date(2025, 3, 5)).delete()
+        self.assertFalse(GoalDailyRollup.objects.filter(date=date(2025, 3, 5)).exists())
+
+    def test_backfill_counts_only_completed_goals(self):
+        backfill_rollups = import_module('wellness.migrations.0008_goaldailyrollup').backfill_rollups
+        GoalDailyRollup.objects.all().delete()
+
+        backfill_rollups(apps, None)
+
+        rollups = {rollup.date: rollup for rollup in GoalDailyRollup.objects.filter(user=self.user)}
+        self.assertEqual(len(rollups), 3)
+        self.assertEqual((rollups[date(2025, 3, 5)].goals, rollups[date(2025, 3, 5)].completed), (2, 1))
+        self.assertEqual(rollups[date(2025, 3, 5)].by_type['sleep'], {'goals': 1, 'completed': 1, 'current': 8, 'target': 8})
+        self.assertEqual(rollups[date(2025, 3, 5)].by_type['steps']['completed'], 0)
+
+    def test_weekly_buckets_for_one_type(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {
+                'from': '2025-03-01', 'to': '2025-03-16', 'bucket': 'week', 'type': 'steps'
+            })
+
+        data = response.data
+        self.assertEqual(data['dates'], [date(2025, 2, 24), date(2025, 3, 3), date(2025, 3, 10)])
+        self.assertEqual(data['current'], [0, 10000, 6000])
+        self.assertEqual(data['target'], [0, 12000, 6000])
+        self.assertEqual(data['completion_rate'], [0, 50.0, 100.0])
+
+    def test_daily_buckets_across_types(self):
+        response = self.client.get(self.url, {'from': '2025-03-04', 'to': '2025-03-05'})
+
+        self.assertEqual(response.data['goals'], [0, 2])
+        self.assertEqual(response.data['completed'], [0, 1])
+
+    def test_invalid_parameters(self):
+        for params in [{'from': 'yesterday'}, {'from': '2025-03-10', 'to': '2025-03-01'}, {'bucket': 'year'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+
+
+class LogGoalProgressViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='water', title='Water', target_value=8,
+            unit='glasses', date=timezone.now().date()
+        )
+        self.url = reverse('log_goal_progress', args=[self.goal.id])
+
+    def test_log_increments_goal_and_marks_completion(self):
+        response = self.client.post(self.url, {'value': 5, 'notes': 'morning'})
+        self.assertEqual(response.data['current_value'], 5)
+        self.assertFalse(response.data['is_completed'])
+
+        response = self.client.post(self.url, {'value': 3})
+        self.assertEqual(response.data['current_value'], 8)
+        self.assertTrue(response.data['is_completed'])
+        self.assertEqual(self.goal.logs.count(), 2)
+        self.assertEqual(self.goal.logs.all()[-1].notes, 'morning')
+        self.assertEqual(PatientComplianceSnapshot.objects.get(user=self.user).compliance_status, 'Goal Met')
+
+    def test_log_adjusts_snapshot_without_recounting(self):
+        with mock.patch.object(PatientComplianceSnapshot.objects, 'refresh_for_users') as refresh:
+            self.client.post(self.url, {'value': 8})
+        refresh.assert_not_called()
+        snapshot = PatientComplianceSnapshot.objects.get(user=self.user)
+        self.assertEqual((snapshot.today_total, snapshot.today_completed), (1, 1))
+
+    def test_cannot_log_to_another_users_goal(self):
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        self.client.force_authenticate(other)
+
+        response = self.client.post(self.url, {'value': 1})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.goal.logs.count(), 0)
+
+    def test_invalid_value(self):
+        response = self.client.post(self.url, {'value': 'lots'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class GoalIncrementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='water', title='Water', target_value=8,
+            date=timezone.now().date()
+        )
+
+    def test_increment_applies_to_the_stored_value(self):
+        # Written by someone else after self.goal was loaded
+        WellnessGoal.objects.filter(pk=self.goal.pk).update(current_value=5)
+
+        self.assertIs(WellnessGoal.objects._increment(self.goal.id, 3, user=self.user), True)
+
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.current_value, 8)
+        self.assertTrue(self.goal.is_completed)
+
+    def test_increment_skips_other_users_goals(self):
+        other = User.objects.create_user(email='other@example.com', password='pass')
+
+        self.assertIsNone(WellnessGoal.objects._increment(self.goal.id, 3, user=other))
+
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.current_value, 0)
+
+    def test_increment_reports_completion_once(self):
+        self.assertIs(WellnessGoal.objects._increment(self.goal.id, 5), False)
+        self.assertIs(WellnessGoal.objects._increment(self.goal.id, 5), True)
+        self.assertIs(WellnessGoal.objects._increment(self.goal.id, 5), False)
+
+    @skipUnless(connection.vendor == 'djongo', 'MongoDB update path')
+    def test_increment_updates_the_document_in_place(self):
+        from .models import _collection
+
+        WellnessGoal.objects._increment(self.goal.id, 2.5)
+        WellnessGoal.objects._increment(self.goal.id, 6)
+
+        document = _collection(WellnessGoal.objects).find_one({'id': self.goal.id})
+        self.assertEqual(document['current_value'], 8.5)
+        self.assertIs(document['is_completed'], True)
+
+
+class BatchLogGoalProgressViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.now().date()
+        self.steps = WellnessGoal.objects.create(
+            user=self.user, goal_type='steps', title='Steps', target_value=1000, date=today
+        )
+        self.sleep = WellnessGoal.objects.create(
+            user=self.user, goal_type='sleep', title='Sleep', target_value=8, date=today
+        )
+        self.url = reverse('batch_log_goal_progress')
+
+    def test_applies_one_increment_per_goal(self):
+        entries = [
+            {'goal_id': self.steps.id, 'value': 60, 'logged_at': f'2026-01-01T08:{minute:02d}:00Z'}
+            for minute in range(20)
+        ]
+        entries.append({'goal_id': self.sleep.id, 'value': 7.5, 'notes': 'watch'})
+
+        response = self.client.post(self.url, entries, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        goals = {goal['goal_type']: goal for goal in response.data}
+        self.assertEqual(goals['steps']['current_value'], 1200)
+        self.assertTrue(goals['steps']['is_completed'])
+        self.assertEqual(goals['sleep']['current_value'], 7.5)
+        self.assertEqual(self.steps.logs.count(), 20)
+        self.assertEqual(self.steps.logs.all()[-1].logged_at.isoformat(), '2026-01-01T08:00:00+00:00')
+        self.assertEqual(GoalLogBucket.objects.filter(goal=self.steps).count(), 1)
+
+    def test_rejects_goals_owned_by_someone_else(self):
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        foreign = WellnessGoal.objects.create(
+            user=other, goal_type='steps', title='Steps', target_value=1000, date=timezone.now().date()
+        )
+
+        response = self.client.post(self.url, [
+            {'goal_id': self.steps.id, 'value': 10},
+            {'goal_id': foreign.id, 'value': 10},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['goal_ids'], [foreign.id])
+        self.steps.refresh_from_db()
+        self.assertEqual(self.steps.current_value, 0)
+        self.assertFalse(GoalLogBucket.objects.exists())
+
+    def test_rejects_invalid_entries(self):
+        response = self.client.post(self.url, [{'goal_id': self.steps.id}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class GoalLogBucketTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.goal = WellnessGoal.objects.create(
+            user=user, goal_type='steps', title='Steps', target_value=10000, date=date(2025, 3, 1)
+        )
+
+    def log_at(self, hour, minute, value, notes=''):
+        logged_at = timezone.make_aware(timezone.datetime(2025, 3, 1, hour, minute))
+        return DailyGoalLog(goal_id=self.goal.id, value=value, notes=notes, logged_at=logged_at)
+
+    def test_entries_are_grouped_per_hour(self):
+        WellnessGoal.objects.apply_logs([self.log_at(9, minute, 10) for minute in range(60)])
+        WellnessGoal.objects.apply_logs([self.log_at(9, 30, 5, 'extra'), self.log_at(10, 0, 7)])
+
+        buckets = list(GoalLogBucket.objects.filter(goal=self.goal).order_by('bucket_start'))
+        self.assertEqual([(b.count, b.total) for b in buckets], [(61, 605), (1, 7)])
+        self.assertEqual(buckets[0].notes, {'60': 'extra'})
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.current_value, 612)
+
+    def test_append_retries_when_bucket_changed_since_read(self):
+        GoalLogBucket.objects.append([self.log_at(9, 0, 1)])
+        stale = GoalLogBucket.objects.get(goal=self.goal)
+        GoalLogBucket.objects.append([self.log_at(9, 5, 2, 'other writer')])
+
+        key = (self.goal.id, stale.bucket_start)
+        GoalLogBucket.objects._extend(key, [(self.log_at(9, 10, 0).logged_at, 4.0, 'late', None)], stale)
+
+        bucket = GoalLogBucket.objects.get(goal=self.goal)
+        self.assertEqual((bucket.count, bucket.total), (3, 7))
+        self.assertEqual(bucket.values, [1, 2, 4])
+        self.assertEqual(bucket.notes, {'1': 'other writer', '2': 'late'})
+
+    def test_append_extends_bucket_created_since_read(self):
+        GoalLogBucket.objects.append([self.log_at(9, 0, 1)])
+        bucket_start = GoalLogBucket.objects.get(goal=self.goal).bucket_start
+
+        # Read before the bucket existed, so the insert conflicts
+        GoalLogBucket.objects._extend((self.goal.id, bucket_start), [(self.log_at(9, 10, 0).logged_at, 4.0, '', None)])
+
+        bucket = GoalLogBucket.objects.get(goal=self.goal)
+        self.assertEqual((bucket.count, bucket.total), (2, 5))
+
+    def test_logs_accessor_merges_legacy_rows(self):
+        DailyGoalLog.objects.create(goal=self.goal, value=3, logged_at=self.log_at(8, 0, 0).logged_at)
+        WellnessGoal.objects.apply_logs([self.log_at(9, 15, 4, 'walk')])
+
+        entries = self.goal.logs.all()
+        self.assertEqual(self.goal.logs.count(), 2)
+        self.assertEqual([(e.value, e.notes) for e in entries], [(4, 'walk'), (3, None)])
+        self.assertEqual(entries[0].logged_at, self.log_at(9, 15, 0).logged_at)
+
+    def test_compact_command_moves_legacy_rows(self):
+        for minute in range(5):
+            DailyGoalLog.objects.create(goal=self.goal, value=1, logged_at=self.log_at(7, minute, 0).logged_at)
+
+        call_command('compact_goal_logs', '--batch-size=2', stdout=StringIO())
+
+        self.assertFalse(DailyGoalLog.objects.exists())
+        bucket = GoalLogBucket.objects.get(goal=self.goal)
+        self.assertEqual((bucket.count, bucket.total), (5, 5))
+        self.assertEqual(self.goal.logs.count(), 5)
+
+    def test_compacting_rows_again_does_not_duplicate_them(self):
+        logs = [
+            DailyGoalLog.objects.create(goal=self.goal, value=1, logged_at=self.log_at(7, minute, 0).logged_at)
+            for minute in range(3)
+        ]
+        # A run that stopped after appending, before deleting the rows
+        GoalLogBucket.objects.append(logs[:2])
+
+        call_command('compact_goal_logs', stdout=StringIO())
+
+        self.assertFalse(DailyGoalLog.objects.exists())
+        bucket = GoalLogBucket.objects.get(goal=self.goal)
+        self.assertEqual((bucket.count, bucket.total), (3, 3))
+        self.assertEqual(sorted(bucket.legacy_ids), sorted(log.id for log in logs))
+
+
+class WearableImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.other = User.objects.create_user(email='other@example.com', password='pass')
+
+    def write_export(self, content, suffix):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as export:
+            export.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_command_imports_ndjson_in_chunks(self):
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='steps', title='Steps', target_value=500,
+            current_value=100, date=date(2025, 3, 1)
+        )
+        samples = [
+            {'user': 'patient@example.com', 'type': 'steps', 'value': 50, 'timestamp': f'2025-03-01T10:{m:02d}:00Z'}
+            for m in range(10)
+        ] + [
+            {'user': self.other.id, 'type': 'sleep', 'value': 7, 'date': '2025-03-02'},
+            {'user': 'nobody@example.com', 'type': 'steps', 'value': 1, 'date': '2025-03-02'},
+            {'user': 'patient@example.com', 'type': 'heart_rate', 'value': 70, 'date': '2025-03-02'},
+        ]
+        path = self.write_export('\n'.join(json.dumps(sample) for sample in samples) + '\nnot json\n', '.ndjson')
+
+        out = StringIO()
+        call_command('import_wearable_data', path, '--chunk-size=3', stdout=out)
+
+        steps = WellnessGoal.objects.get(user=self.user, goal_type='steps', date=date(2025, 3, 1))
+        self.assertEqual(steps.current_value, 600)
+        self.assertTrue(steps.is_completed)
+        self.assertEqual(steps.logs.count(), 10)
+        sleep = WellnessGoal.objects.get(user=self.other, goal_type='sleep', date=date(2025, 3, 2))
+        self.assertEqual(sleep.current_value, 7)
+        self.assertEqual(sleep.target_value, WellnessGoal.DEFAULT_GOALS['sleep']['target_value'])
+        self.assertIn('Imported 11 of 14 samples (3 skipped, 1 goals created)', out.getvalue())
+
+    def test_upload_endpoint_imports_csv_for_current_user(self):
+        content = (
+            'user,type,value,timestamp\n'
+            'other@example.com,active_time,30,2025-03-05T07:00:00Z\n'
+            'other@example.com,active_time,45,2025-03-05T18:00:00Z\n'
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(reverse('import_wearable_data'), {
+            'file': SimpleUploadedFile('export.csv', content.encode()),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+        goal = WellnessGoal.objects.get(goal_type='active_time')
+        self.assertEqual(goal.user, self.user)
+        self.assertEqual(goal.current_value, 75)
+
+    def test_unparseable_timestamps_skip_only_that_sample(self):
+        samples = [
+            {'type': 'steps', 'value': 10, 'timestamp': 1700000000},
+            {'type': 'steps', 'value': 10, 'timestamp': '2024-13-01T00:00:00'},
+            {'type': 'steps', 'value': 10, 'date': '2024-02-30'},
+            {'type': 'steps', 'value': 10, 'date': '2024-02-01'},
+        ]
+
+        summary = WearableImport(user=self.user).run(samples).summary()
+
+        self.assertEqual((summary['imported'], summary['skipped']), (1, 3))
+        self.assertEqual(
+            {error['error'] for error in summary['errors']}, {'Missing or invalid timestamp/date'}
+        )
+
+    def test_goals_created_elsewhere_meanwhile_are_not_counted(self):
+        WellnessGoal.objects.create(
+            user=self.user, goal_type='steps', title='Steps', target_value=500, date=date(2025, 3, 1)
+        )
+        samples = [
+            {'type': 'steps', 'value': 10, 'date': '2025-03-01'},
+            {'type': 'sleep', 'value': 7, 'date': '2025-03-01'},
+        ]
+        lookup = WearableImport._existing_goal_ids
+        calls = []
+
+        def racing_lookup(importer, keys):
+            # The first lookup runs before the steps goal was "created"
+            calls.append(keys)
+            return {} if len(calls) == 1 else lookup(importer, keys)
+
+        with mock.patch.object(WearableImport, '_existing_goal_ids', racing_lookup):
+            summary = WearableImport(user=self.user).run(samples).summary()
+
+        self.assertEqual(summary['imported'], 2)
+        self.assertEqual(summary['goals_created'], 1)
+        self.assertEqual(WellnessGoal.objects.filter(user=self.user).count(), 2)
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.now().date()
+
+    def follow(self, url, key='next'):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data[key]
+        return ids
+
+    def test_pages_through_goals_without_gaps_or_duplicates(self):
+        # Several goals share a date, so the pk tie breaker is exercised
+        for days in range(5):
+            for goal_type in ('steps', 'sleep', 'water'):
+                WellnessGoal.objects.create(
+                    user=self.user, goal_type=goal_type, title=goal_type,
+                    target_value=10, date=self.today - timedelta(days=days)
+                )
+        expected = list(WellnessGoal.objects.filter(user=self.user).values_list('id', flat=True))
+
+        ids = self.follow(reverse('goals_list') + '?page_size=4')
+
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        for days in range(6):
+            WellnessGoal.objects.create(
+                user=self.user, goal_type='steps', title='Steps',
+                target_value=10, date=self.today - timedelta(days=days)
+            )
+        url = reverse('goals_list') + '?page_size=2'
+        first = self.client.get(url)
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_reminders_with_null_times(self):
+        for days, scheduled_time in [(1, '09:00'), (1, None), (2, None), (1, '08:00'), (3, '10:00')]:
+            PreventiveCareReminder.objects.create(
+                user=self.user, reminder_type='checkup', title='Checkup',
+                scheduled_date=self.today + timedelta(days=days), scheduled_time=scheduled_time
+            )
+        expected = list(PreventiveCareReminder.objects.filter(user=self.user).values_list('id', flat=True))
+        url = reverse('reminders_list') + '?page_size=2'
+
+        forward = self.follow(url)
+        last_page = self.client.get(url)
+        while last_page.data['next']:
+            last_page = self.client.get(last_page.data['next'])
+        backward = self.follow(last_page.data['previous'], key='previous')
+
+        self.assertEqual(forward, expected)
+        self.assertEqual(sorted(backward), sorted(expected[:-1]))
+
+    def test_page_size_is_capped(self):
+        WellnessGoal.objects.bulk_create([
+            WellnessGoal(user=self.user, goal_type='steps', title='Steps', target_value=10,
+                         date=self.today - timedelta(days=days))
+            for days in range(5)
+        ])
+
+        with self.settings(API_MAX_PAGE_SIZE=3):
+            response = self.client.get(reverse('goals_list') + '?page_size=100')
+
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('goals_list') + '?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        dashboard_cache.reset_stats()
+        self.user = User.objects.create_user(email='patient@example.com', password='pass', first_name='Pat')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.now().date()
+        self.goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='water', title='Water', target_value=8, date=self.today
+        )
+
+    def test_repeated_requests_are_served_from_cache(self):
+        # The dashboard still runs its ETag metadata queries
+        for name, queries in (('dashboard', 2), ('today_goals', 0), ('upcoming_reminders', 0)):
+            first = self.client.get(reverse(name))
+            with self.assertNumQueries(queries):
+                second = self.client.get(reverse(name))
+            self.assertEqual(second.data, first.data)
+
+        self.assertEqual(dashboard_cache.stats()['hits'], 3)
+        self.assertEqual(dashboard_cache.stats()['misses'], 3)
+
+    def test_logging_progress_invalidates(self):
+        self.client.get(reverse('today_goals'))
+
+        self.client.post(reverse('log_goal_progress', args=[self.goal.id]), {'value': 3})
+        response = self.client.get(reverse('today_goals'))
+
+        self.assertEqual(response.data[0]['current_value'], 3)
+        self.assertGreaterEqual(dashboard_cache.stats()['invalidations'], 1)
+
+    def test_reminder_changes_invalidate(self):
+        self.assertEqual(self.client.get(reverse('upcoming_reminders')).data, [])
+
+        reminder = PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='dental', title='Dentist', scheduled_date=self.today + timedelta(days=2)
+        )
+        self.assertEqual(len(self.client.get(reverse('dashboard')).data['reminders']), 1)
+        self.assertEqual(len(self.client.get(reverse('upcoming_reminders')).data), 1)
+
+        reminder.delete()
+        self.assertEqual(self.client.get(reverse('upcoming_reminders')).data, [])
+
+    def test_other_users_are_not_invalidated(self):
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        self.client.get(reverse('today_goals'))
+
+        WellnessGoal.objects.create(user=other, goal_type='water', title='Water', target_value=8, date=self.today)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('today_goals'))
+
+    def test_entries_expire_at_date_rollover(self):
+        self.client.get(reverse('today_goals'))
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            response = self.client.get(reverse('today_goals'))
+
+        self.assertEqual(response.data[0]['date'], str(tomorrow.date()))
+
+    def test_stats_are_admin_only(self):
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('dashboard'))
+        self.assertEqual(self.client.get(reverse('dashboard_cache_stats')).status_code, 403)
+
+        staff = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get(reverse('dashboard_cache_stats')).status_code, 403)
+
+        admin = User.objects.create_user(email='admin@example.com', password='pass', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('dashboard_cache_stats'))
+
+        self.assertEqual(response.data['hit_rate'], 0.5)
+
+
+class HealthTipOfDayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.now().date()
+        self.tips = [HealthTip.objects.create(title=f'Tip {i}', content='...') for i in range(5)]
+
+    def test_same_tip_for_the_whole_day_on_both_endpoints(self):
+        tip = self.client.get(reverse('health_tip')).data
+
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse('health_tip')).data
+        dashboard = self.client.get(reverse('dashboard')).data
+
+        expected = self.tips[self.today.toordinal() % len(self.tips)]
+        self.assertEqual(tip['id'], expected.id)
+        self.assertEqual(again, tip)
+        self.assertEqual(dashboard['health_tip'], tip)
+
+    def test_selection_does_not_load_every_tip(self):
+        with self.assertNumQueries(3):
+            tip = HealthTip.objects.for_day(self.today)
+
+        self.assertIn(tip, self.tips)
+        self.assertNotEqual(HealthTip.objects.for_day(self.today + timedelta(days=1)), tip)
+
+    def test_scheduled_tip_wins_and_changes_invalidate(self):
+        self.client.get(reverse('health_tip'))
+
+        scheduled = HealthTip.objects.create(title='Today', content='...', display_date=self.today)
+        self.assertEqual(self.client.get(reverse('health_tip')).data['id'], scheduled.id)
+
+        scheduled.is_active = False
+        scheduled.save()
+        self.assertNotEqual(self.client.get(reverse('health_tip')).data['id'], scheduled.id)
+
+    def test_tip_change_refreshes_cached_dashboard(self):
+        first = self.client.get(reverse('dashboard'))
+
+        tip = HealthTip.objects.get(pk=first.data['health_tip']['id'])
+        tip.title = 'Edited'
+        tip.save()
+        second = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['health_tip']['title'], 'Edited')
+
+    def test_default_tip_without_active_tips(self):
+        HealthTip.objects.update(is_active=False)
+
+        response = self.client.get(reverse('health_tip'))
+
+        self.assertEqual(response.data['title'], 'Stay Hydrated')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='patient@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.goal = WellnessGoal.objects.create(
+            user=self.user, goal_type='water', title='Water', target_value=8, date=timezone.now().date()
+        )
+
+    def test_matching_etag_returns_304_after_one_query(self):
+        url = reverse('goals_list')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_when_goals_change(self):
+        url = reverse('goals_list')
+        etag = self.client.get(url)['ETag']
+
+        self.client.post(reverse('log_goal_progress', args=[self.goal.id]), {'value': 2})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.goal.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_page_and_filters(self):
+        url = reverse('reminders_list')
+        PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='dental', title='Dentist', scheduled_date=timezone.now().date()
+        )
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url + '?status=completed', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_dashboard_etag_tracks_reminders(self):
+        url = reverse('dashboard')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        PreventiveCareReminder.objects.create(
+            user=self.user, reminder_type='dental', title='Dentist', scheduled_date=timezone.now().date()
+        )
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_non_patients_get_no_etag(self):
+        provider = User.objects.create_user(email='provider@example.com', password='pass', role='provider')
+        self.client.force_authenticate(provider)
+
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ConcurrentLogGoalProgressTests(TransactionTestCase):
+    def test_parallel_logs_are_not_lost(self):
+        user = User.objects.create_user(email='patient@example.com', password='pass')
+        goal = WellnessGoal.objects.create(
+            user=user, goal_type='steps', title='Steps', target_value=10000,
+            date=timezone.now().date()
+        )
+        url = reverse('log_goal_progress', args=[goal.id])
+
+        def log(value):
+            try:
+                client = APIClient()
+                client.force_authenticate(user)
+                return client.post(url, {'value': value}).status_code
+            finally:
+                connection.close()
+
+        values = [100 + i for i in range(40)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(log, values))
+
+        self.assertEqual(statuses, [200] * len(values))
+        goal.refresh_from_db()
+        self.assertEqual(goal.current_value, sum(values))
+        self.assertEqual(goal.logs.count(), len(values))
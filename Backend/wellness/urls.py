@@ -1,15 +1,19 @@
 from django.urls import path
 from .views import (
-    WellnessGoalListCreateView, WellnessGoalDetailView, LogGoalProgressView,
-    TodayGoalsView, WeeklyProgressView, PreventiveCareReminderListCreateView,
+    WellnessGoalListCreateView, WellnessGoalDetailView, LogGoalProgressView, BatchLogGoalProgressView,
+    ImportWearableDataView, TodayGoalsView, WeeklyProgressView, GoalHistoryView,
+    PreventiveCareReminderListCreateView,
     PreventiveCareReminderDetailView, UpcomingRemindersView, HealthTipOfDayView,
-    DashboardSummaryView
+    DashboardSummaryView, DashboardCacheStatsView
 )
 
 urlpatterns = [
     # Goals - specific paths MUST come before generic pk patterns
     path('goals/today/', TodayGoalsView.as_view(), name='today_goals'),
     path('goals/weekly/', WeeklyProgressView.as_view(), name='weekly_progress'),
+    path('goals/history/', GoalHistoryView.as_view(), name='goal_history'),
+    path('goals/batch-log/', BatchLogGoalProgressView.as_view(), name='batch_log_goal_progress'),
+    path('goals/import/', ImportWearableDataView.as_view(), name='import_wearable_data'),
     path('goals/', WellnessGoalListCreateView.as_view(), name='goals_list'),
     path('goals/<pk>/', WellnessGoalDetailView.as_view(), name='goal_detail'),
     path('goals/<goal_id>/log/', LogGoalProgressView.as_view(), name='log_goal_progress'),
@@ -24,4 +28,5 @@ urlpatterns = [
     
     # Dashboard
     path('dashboard/', DashboardSummaryView.as_view(), name='dashboard'),
+    path('dashboard/cache-stats/', DashboardCacheStatsView.as_view(), name='dashboard_cache_stats'),
 ]
@@ -2,15 +2,18 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
-from django.db.models import Sum
-from datetime import timedelta
-import random
+from django.db.models import Count, Sum
+from datetime import date as date_cls, timedelta
 import traceback
 
-from .models import WellnessGoal, DailyGoalLog, PreventiveCareReminder, HealthTip
+from accounts.permissions import IsAdmin
+from core.conditional import conditional_get, make_etag, queryset_state
+from . import cache as dashboard_cache
+from .models import WellnessGoal, PreventiveCareReminder, GoalDailyRollup
+from .ingest import FORMATS, WearableImport, detect_format, read_samples
 from .serializers import (
     WellnessGoalSerializer, WellnessGoalCreateSerializer, WellnessGoalUpdateSerializer,
-    LogGoalProgressSerializer, PreventiveCareReminderSerializer, HealthTipSerializer
+    LogGoalProgressSerializer, BatchLogGoalProgressSerializer, PreventiveCareReminderSerializer
 )
 
 
@@ -22,6 +25,13 @@ class WellnessGoalListCreateView(generics.ListCreateAPIView):
             return WellnessGoalCreateSerializer
         return WellnessGoalSerializer
     
+    def get_etag(self, request):
+        return make_etag(request.user.pk, request.get_full_path(), queryset_state(self.get_queryset()))
+    
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = WellnessGoal.objects.filter(user=self.request.user)
         
@@ -108,26 +118,75 @@ class LogGoalProgressView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, goal_id):
+        serializer = LogGoalProgressSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            goal = WellnessGoal.objects.get(id=goal_id, user=request.user)
-        except WellnessGoal.DoesNotExist:
+            goal = WellnessGoal.objects.log_progress(
+                goal_id,
+                request.user,
+                serializer.validated_data['value'],
+                serializer.validated_data.get('notes', '')
+            )
+        except (ValueError, TypeError):
+            goal = None
+        if goal is None:
             return Response({'error': 'Goal not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        serializer = LogGoalProgressSerializer(data=request.data)
-        if serializer.is_valid():
-            value = serializer.validated_data['value']
-            notes = serializer.validated_data.get('notes', '')
-            
-            # Create log entry
-            DailyGoalLog.objects.create(goal=goal, value=value, notes=notes)
-            
-            # Update goal current value - convert to float for MongoDB Decimal128 compatibility
-            current = float(goal.current_value) if goal.current_value else 0
-            goal.current_value = current + float(value)
-            goal.save()
-            
-            return Response(WellnessGoalSerializer(goal).data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(WellnessGoalSerializer(goal).data)
+
+
+class BatchLogGoalProgressView(APIView):
+    """Log many progress entries across the user's goals in one request"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = BatchLogGoalProgressSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=BatchLogGoalProgressSerializer.MAX_ENTRIES
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        entries = serializer.validated_data
+        goal_ids = {entry['goal_id'] for entry in entries}
+        owned = set(
+            WellnessGoal.objects.filter(user=request.user, pk__in=goal_ids).values_list('id', flat=True)
+        )
+        missing = goal_ids - owned
+        if missing:
+            return Response(
+                {'error': 'Goal not found', 'goal_ids': sorted(missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        goals = WellnessGoal.objects.log_progress_batch(request.user, entries)
+        return Response(WellnessGoalSerializer(goals, many=True).data)
+
+
+class ImportWearableDataView(APIView):
+    """Import a wearable NDJSON/CSV export for the current user"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response(
+                {'error': f"Unsupported format, expected one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Large uploads are spooled to disk by Django, so this reads the file
+        # line by line without holding it in memory
+        importer = WearableImport(user=request.user).run(read_samples(upload, fmt))
+        return Response(importer.summary())
 
 
 class TodayGoalsView(APIView):
@@ -136,74 +195,28 @@ class TodayGoalsView(APIView):
     
     def get(self, request):
         try:
-            today = timezone.now().date()
-            goals = WellnessGoal.objects.filter(user=request.user, date=today)
-            
-            # If no goals for today, check for recurring goals and create them
-            if not goals.exists():
-                # First, check for recurring goals from previous days
-                recurring_goals = WellnessGoal.objects.filter(
-                    user=request.user,
-                    is_recurring=True
-                ).exclude(date=today).order_by('-date')
-                
-                # Get unique goal types from recurring goals (most recent for each type)
-                seen_types = set()
-                for goal in recurring_goals:
-                    if goal.goal_type not in seen_types:
-                        seen_types.add(goal.goal_type)
-                        try:
-                            WellnessGoal.objects.get_or_create(
-                                user=request.user,
-                                goal_type=goal.goal_type,
-                                date=today,
-                                defaults={
-                                    'title': goal.title,
-                                    'target_value': float(goal.target_value),
-                                    'current_value': 0.0,
-                                    'unit': goal.unit,
-                                    'is_recurring': True,
-                                }
-                            )
-                        except Exception as e:
-                            print(f"Error creating recurring goal: {e}")
-                            continue
-                
-                # If still no goals, create default goals
-                goals = WellnessGoal.objects.filter(user=request.user, date=today)
-                if not goals.exists():
-                    default_goal_types = ['steps', 'active_time', 'sleep']
-                    for goal_type in default_goal_types:
-                        try:
-                            defaults = WellnessGoal.DEFAULT_GOALS.get(goal_type, {})
-                            WellnessGoal.objects.get_or_create(
-                                user=request.user,
-                                goal_type=goal_type,
-                                date=today,
-                                defaults={
-                                    'title': defaults.get('title', goal_type.replace('_', ' ').title()),
-                                    'target_value': float(defaults.get('target_value', 0)),
-                                    'current_value': 0.0,
-                                    'unit': defaults.get('unit', ''),
-                                    'is_recurring': True,  # Default goals are recurring
-                                }
-                            )
-                        except Exception as e:
-                            print(f"Error creating default goal: {e}")
-                            continue
-                    goals = WellnessGoal.objects.filter(user=request.user, date=today)
-            
-            serializer = WellnessGoalSerializer(goals, many=True)
-            return Response(serializer.data)
+            return Response(dashboard_cache.get_or_build('today_goals', request.user, lambda: self.build(request.user)))
         except Exception as e:
             print(f"TodayGoalsView error: {e}")
             traceback.print_exc()
             # Return empty goals instead of error to allow dashboard to load
             return Response([])
+    
+    def build(self, user):
+        today = timezone.now().date()
+        goals = WellnessGoal.objects.filter(user=user, date=today)
+        
+        # If no goals for today, roll the user's recurring goal templates
+        # (or the default goals) over to today in one insert
+        if not goals.exists():
+            WellnessGoal.objects.materialize_day(user, today)
+            goals = WellnessGoal.objects.filter(user=user, date=today)
+        
+        return WellnessGoalSerializer(goals, many=True).data
 
 
 class WeeklyProgressView(APIView):
-    """Get weekly progress summary"""
+    """Get weekly progress summary, with the week's goals when ?include_goals=true"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -217,32 +230,146 @@ class WeeklyProgressView(APIView):
                 date__lte=today
             )
             
-            # Calculate weekly stats
-            total_goals = goals.count()
-            completed_goals = goals.filter(is_completed=True).count()
-            
-            # Steps summary
-            steps_data = goals.filter(goal_type='steps').aggregate(
+            # All weekly stats come from one query grouped by day, goal type and
+            # completion (djongo silently drops the FILTER of a filtered Count)
+            rows = goals.order_by().values('date', 'goal_type', 'is_completed').annotate(
+                goals=Count('id'),
                 total=Sum('current_value'),
-                target=Sum('target_value')
+                target=Sum('target_value'),
             )
             
-            return Response({
+            by_type = {}
+            by_day = {}
+            for row in rows:
+                type_stats = by_type.setdefault(row['goal_type'], {'goals': 0, 'completed': 0, 'total': 0.0, 'target': 0.0})
+                day_stats = by_day.setdefault(row['date'], {'goals': 0, 'completed': 0})
+                for stats in (type_stats, day_stats):
+                    stats['goals'] += row['goals']
+                    if row['is_completed']:
+                        stats['completed'] += row['goals']
+                type_stats['total'] += row['total'] or 0
+                type_stats['target'] += row['target'] or 0
+            for stats in by_type.values():
+                stats['average'] = round(stats['total'] / stats['goals'], 2)
+            
+            total_goals = sum(stats['goals'] for stats in by_type.values())
+            completed_goals = sum(stats['completed'] for stats in by_type.values())
+            steps = by_type.get('steps')
+            
+            data = {
                 'total_goals': total_goals,
                 'completed_goals': completed_goals,
                 'completion_rate': round((completed_goals / total_goals * 100) if total_goals > 0 else 0, 1),
-                'steps_summary': steps_data,
-                'goals': WellnessGoalSerializer(goals, many=True).data
-            })
+                'steps_summary': {
+                    'total': steps['total'] if steps else None,
+                    'target': steps['target'] if steps else None,
+                },
+                'by_type': by_type,
+                'daily': [
+                    {
+                        'date': day,
+                        'goals': by_day.get(day, {}).get('goals', 0),
+                        'completed': by_day.get(day, {}).get('completed', 0),
+                    }
+                    for day in (week_ago + timedelta(days=i) for i in range((today - week_ago).days + 1))
+                ],
+            }
+            
+            # The full goal list is only serialized when asked for
+            if request.query_params.get('include_goals', '').lower() == 'true':
+                data['goals'] = WellnessGoalSerializer(goals, many=True).data
+            return Response(data)
         except Exception as e:
             print(f"WeeklyProgressView error: {e}")
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class GoalHistoryView(APIView):
+    """Progress history over a date range, grouped into day/week/month buckets.
+
+    Reads the precomputed daily rollups and returns parallel arrays, one entry
+    per bucket.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    BUCKETS = {
+        'day': lambda day: day,
+        'week': lambda day: day - timedelta(days=day.weekday()),
+        'month': lambda day: day.replace(day=1),
+    }
+    MAX_DAYS = 366 * 5
+    
+    def get(self, request):
+        params = request.query_params
+        try:
+            end = date_cls.fromisoformat(params['to']) if params.get('to') else timezone.now().date()
+            start = date_cls.fromisoformat(params['from']) if params.get('from') else end - timedelta(days=29)
+        except ValueError:
+            return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end or (end - start).days >= self.MAX_DAYS:
+            return Response(
+                {'error': f'from must be on or before to, and the range at most {self.MAX_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        bucket = params.get('bucket', 'day')
+        if bucket not in self.BUCKETS:
+            return Response({'error': 'bucket must be one of: day, week, month'}, status=status.HTTP_400_BAD_REQUEST)
+        bucket_of = self.BUCKETS[bucket]
+        goal_type = params.get('type')
+        
+        # Every bucket in the range is returned, including empty ones
+        buckets = {}
+        day = start
+        while day <= end:
+            buckets.setdefault(bucket_of(day), {'current': 0.0, 'target': 0.0, 'goals': 0, 'completed': 0})
+            day += timedelta(days=1)
+        
+        rollups = GoalDailyRollup.objects.filter(user=request.user, date__range=(start, end))
+        for rollup in rollups.values('date', 'goals', 'completed', 'current_total', 'target_total', 'by_type'):
+            if goal_type:
+                stats = rollup['by_type'].get(goal_type)
+                if not stats:
+                    continue
+            else:
+                stats = {
+                    'goals': rollup['goals'],
+                    'completed': rollup['completed'],
+                    'current': rollup['current_total'],
+                    'target': rollup['target_total'],
+                }
+            totals = buckets[bucket_of(rollup['date'])]
+            for key in totals:
+                totals[key] += stats[key]
+        
+        return Response({
+            'from': start,
+            'to': end,
+            'bucket': bucket,
+            'type': goal_type,
+            'dates': list(buckets),
+            'current': [totals['current'] for totals in buckets.values()],
+            'target': [totals['target'] for totals in buckets.values()],
+            'goals': [totals['goals'] for totals in buckets.values()],
+            'completed': [totals['completed'] for totals in buckets.values()],
+            'completion_rate': [
+                round(totals['completed'] / totals['goals'] * 100, 1) if totals['goals'] else 0
+                for totals in buckets.values()
+            ],
+        })
+
+
 class PreventiveCareReminderListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PreventiveCareReminderSerializer
     
+    def get_etag(self, request):
+        return make_etag(request.user.pk, request.get_full_path(), queryset_state(self.get_queryset()))
+    
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = PreventiveCareReminder.objects.filter(user=self.request.user)
         
@@ -268,18 +395,20 @@ class UpcomingRemindersView(APIView):
     
     def get(self, request):
         try:
-            today = timezone.now().date()
-            reminders = PreventiveCareReminder.objects.filter(
-                user=request.user,
-                status='upcoming',
-                scheduled_date__gte=today
-            ).order_by('scheduled_date')[:5]
-            
-            serializer = PreventiveCareReminderSerializer(reminders, many=True)
-            return Response(serializer.data)
+            return Response(dashboard_cache.get_or_build('upcoming_reminders', request.user, lambda: self.build(request.user)))
         except Exception as e:
             print(f"UpcomingRemindersView error: {e}")
             return Response([], status=status.HTTP_200_OK)
+    
+    def build(self, user):
+        today = timezone.now().date()
+        reminders = PreventiveCareReminder.objects.filter(
+            user=user,
+            status='upcoming',
+            scheduled_date__gte=today
+        ).order_by('scheduled_date')[:5]
+        
+        return PreventiveCareReminderSerializer(reminders, many=True).data
 
 
 class HealthTipOfDayView(APIView):
@@ -288,43 +417,31 @@ class HealthTipOfDayView(APIView):
     
     def get(self, request):
         try:
-            today = timezone.now().date()
-            
-            # Try to get tip for today
-            tip = HealthTip.objects.filter(display_date=today, is_active=True).first()
-            
-            # If no specific tip for today, get a random active tip
-            if not tip:
-                tips = list(HealthTip.objects.filter(is_active=True))
-                if tips:
-                    tip = random.choice(tips)
-            
-            if tip:
-                serializer = HealthTipSerializer(tip)
-                return Response(serializer.data)
-            
-            # Return a default tip if none exist in database
-            return Response({
-                'id': 0,
-                'title': 'Stay Hydrated',
-                'content': 'Aim to drink at least 8 glasses of water per day to keep your body hydrated and functioning optimally.',
-                'category': 'hydration'
-            })
+            return Response(dashboard_cache.tip_of_day())
         except Exception as e:
             print(f"HealthTipOfDayView error: {e}")
             # Return default tip on error
-            return Response({
-                'id': 0,
-                'title': 'Stay Hydrated',
-                'content': 'Aim to drink at least 8 glasses of water per day to keep your body hydrated and functioning optimally.',
-                'category': 'hydration'
-            })
+            return Response(dashboard_cache.DEFAULT_TIP)
 
 
 class DashboardSummaryView(APIView):
     """Get complete dashboard summary for patients"""
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_etag(self, request):
+        if request.user.role != 'patient':
+            return None
+        today = timezone.now().date()
+        return make_etag(
+            request.user.pk, request.user.updated_at, today,
+            queryset_state(WellnessGoal.objects.filter(user=request.user, date=today)),
+            queryset_state(PreventiveCareReminder.objects.filter(
+                user=request.user, status='upcoming', scheduled_date__gte=today
+            )),
+            dashboard_cache.tip_of_day(),
+        )
+    
+    @conditional_get
     def get(self, request):
         try:
             if request.user.role != 'patient':
@@ -333,35 +450,38 @@ class DashboardSummaryView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            today = timezone.now().date()
-            
-            # Get today's goals
-            goals = WellnessGoal.objects.filter(user=request.user, date=today)
-            
-            # Get upcoming reminders
-            reminders = PreventiveCareReminder.objects.filter(
-                user=request.user,
-                status='upcoming',
-                scheduled_date__gte=today
-            ).order_by('scheduled_date')[:3]
-            
-            # Get health tip
-            tip = HealthTip.objects.filter(is_active=True).first()
-            tip_data = HealthTipSerializer(tip).data if tip else {
-                'title': 'Stay Hydrated',
-                'content': 'Aim to drink at least 8 glasses of water per day.',
-                'category': 'hydration'
-            }
-            
-            return Response({
-                'user': {
-                    'first_name': request.user.first_name,
-                    'last_name': request.user.last_name,
-                },
-                'goals': WellnessGoalSerializer(goals, many=True).data,
-                'reminders': PreventiveCareReminderSerializer(reminders, many=True).data,
-                'health_tip': tip_data
-            })
+            return Response(dashboard_cache.get_or_build('dashboard', request.user, lambda: self.build(request.user)))
         except Exception as e:
             print(f"DashboardSummaryView error: {e}")
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def build(self, user):
+        today = timezone.now().date()
+        
+        # Get today's goals
+        goals = WellnessGoal.objects.filter(user=user, date=today)
+        
+        # Get upcoming reminders
+        reminders = PreventiveCareReminder.objects.filter(
+            user=user,
+            status='upcoming',
+            scheduled_date__gte=today
+        ).order_by('scheduled_date')[:3]
+        
+        return {
+            'user': {
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+            },
+            'goals': WellnessGoalSerializer(goals, many=True).data,
+            'reminders': PreventiveCareReminderSerializer(reminders, many=True).data,
+            'health_tip': dashboard_cache.tip_of_day()
+        }
+
+
+class DashboardCacheStatsView(APIView):
+    """Hit rate and invalidation counts of the dashboard cache in this process (admins only)"""
+    permission_classes = [IsAdmin]
+    
+    def get(self, request):
+        return Response(dashboard_cache.stats())
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { wellnessAPI } from '../services/api';
+import { wellnessAPI, fetchPage } from '../services/api';
 import Card from '../components/common/Card';
 import Button from '../components/common/Button';
 import Input from '../components/common/Input';
@@ -9,7 +9,9 @@ import './Goals.css';
 
 const Goals = () => {
   const [goals, setGoals] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showForm, setShowForm] = useState(false);
   const [editingGoal, setEditingGoal] = useState(null);
   const [formData, setFormData] = useState({
@@ -32,16 +34,31 @@ const Goals = () => {
 
   const fetchGoals = async () => {
     try {
-      const response = await wellnessAPI.getGoals();
-      setGoals(response.data);
+      const page = await fetchPage(wellnessAPI.getGoals);
+      setGoals(page.results);
+      setNextCursor(page.cursor);
     } catch (error) {
       console.error('Error fetching goals:', error);
       setGoals([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreGoals = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(wellnessAPI.getGoals, { cursor: nextCursor });
+      setGoals((current) => [...current, ...page.results]);
+      setNextCursor(page.cursor);
+    } catch (error) {
+      console.error('Error fetching goals:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const resetForm = () => {
     setFormData({
       goal_type: 'steps',
@@ -358,6 +375,14 @@ const Goals = () => {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <Button variant="secondary" loading={loadingMore} onClick={loadMoreGoals}>
+            Load More
+          </Button>
+        </div>
+      )}
+
       {/* Delete Confirmation Modal */}
       <ConfirmModal
         isOpen={showDeleteModal}
@@ -1,13 +1,15 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { healthAPI } from '../services/api';
+import { healthAPI, fetchPage } from '../services/api';
 import Card from '../components/common/Card';
 import Button from '../components/common/Button';
 import './HealthTopics.css';
 
 const HealthTopics = () => {
   const [articles, setArticles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeCategory, setActiveCategory] = useState('all');
 
   const categories = [
@@ -23,19 +25,35 @@ const HealthTopics = () => {
     fetchArticles();
   }, [activeCategory]);
 
+  const categoryParams = () => (activeCategory !== 'all' ? { category: activeCategory } : {});
+
   const fetchArticles = async () => {
     try {
-      const params = activeCategory !== 'all' ? { category: activeCategory } : {};
-      const response = await healthAPI.getArticles(params);
-      setArticles(response.data);
+      const page = await fetchPage(healthAPI.getArticles, categoryParams());
+      setArticles(page.results);
+      setNextCursor(page.cursor);
     } catch (error) {
       console.error('Error fetching articles:', error);
       setArticles([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreArticles = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(healthAPI.getArticles, { ...categoryParams(), cursor: nextCursor });
+      setArticles((current) => [...current, ...page.results]);
+      setNextCursor(page.cursor);
+    } catch (error) {
+      console.error('Error fetching articles:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filteredArticles = activeCategory === 'all' 
     ? articles 
     : articles.filter(a => a.category === activeCategory);
@@ -86,6 +104,14 @@ const HealthTopics = () => {
         </div>
       )}
 
+      {!loading && nextCursor && (
+        <div className="load-more">
+          <Button variant="secondary" loading={loadingMore} onClick={loadMoreArticles}>
+            Load More
+          </Button>
+        </div>
+      )}
+
       {!loading && filteredArticles.length === 0 && (
         <Card className="no-articles">
           <p>No articles found in this category.</p>
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { wellnessAPI } from '../services/api';
+import { wellnessAPI, fetchPage } from '../services/api';
 import Card from '../components/common/Card';
 import Button from '../components/common/Button';
 import Input from '../components/common/Input';
@@ -8,7 +8,9 @@ import './Reminders.css';
 
 const Reminders = () => {
   const [reminders, setReminders] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showForm, setShowForm] = useState(false);
   const [editingReminder, setEditingReminder] = useState(null);
   const [formData, setFormData] = useState({
@@ -34,16 +36,31 @@ const Reminders = () => {
 
   const fetchReminders = async () => {
     try {
-      const response = await wellnessAPI.getReminders();
-      setReminders(response.data);
+      const page = await fetchPage(wellnessAPI.getReminders);
+      setReminders(page.results);
+      setNextCursor(page.cursor);
     } catch (error) {
       console.error('Error fetching reminders:', error);
       setReminders([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreReminders = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(wellnessAPI.getReminders, { cursor: nextCursor });
+      setReminders((current) => [...current, ...page.results]);
+      setNextCursor(page.cursor);
+    } catch (error) {
+      console.error('Error fetching reminders:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const resetForm = () => {
     setFormData({
       reminder_type: 'checkup',
@@ -418,6 +435,14 @@ const Reminders = () => {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <Button variant="secondary" loading={loadingMore} onClick={loadMoreReminders}>
+            Load More
+          </Button>
+        </div>
+      )}
+
       {/* Delete Confirmation Modal */}
       <ConfirmModal
         isOpen={showDeleteModal}
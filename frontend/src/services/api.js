@@ -52,6 +52,18 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are cursor paginated. Only the cursor is taken from the
+// `next` link: the link itself is absolute and, behind the TLS proxy, plain
+// http, so the following page is requested through `api` like the first.
+export const fetchPage = async (request, params = {}) => {
+  const response = await request(params);
+  const { next, results } = response.data;
+  return {
+    results,
+    cursor: next ? new URL(next, window.location.origin).searchParams.get('cursor') : null,
+  };
+};
+
 // Auth API
 export const authAPI = {
   login: (credentials) => api.post('/auth/login/', credentials),
@@ -72,7 +84,7 @@ export const wellnessAPI = {
   deleteGoal: (id) => api.delete(`/wellness/goals/${id}/`),
   logProgress: (goalId, data) => api.post(`/wellness/goals/${goalId}/log/`, data),
   getWeeklyProgress: () => api.get('/wellness/goals/weekly/'),
-  getReminders: () => api.get('/wellness/reminders/'),
+  getReminders: (params) => api.get('/wellness/reminders/', { params }),
   getUpcomingReminders: () => api.get('/wellness/reminders/upcoming/'),
   createReminder: (data) => api.post('/wellness/reminders/', data),
   updateReminder: (id, data) => api.patch(`/wellness/reminders/${id}/`, data),